@@ -21,7 +21,7 @@ from config import Config, RESOURCE_DIR
 
 # 业务模块
 from service.minecraft.login.microsoft_auth import MicrosoftAuth
-from service.minecraft.download import MinecraftDownloadManager, LoaderType, DownloadProgress
+from service.minecraft.download import MinecraftDownloadManager, LoaderType, DownloadProgress, VerifiedCache
 from service.minecraft.game_launcher import GameLauncher
 from service.syncthing.syncthing_manager import SyncthingManager
 from service.easytier.easytier_manager import EasytierManager
@@ -1456,16 +1456,13 @@ def api_mc_list_versions(version_type: str = None):
     """列出所有可用的 Minecraft 版本"""
     try:
         # 使用临时下载管理器加载版本列表（不需要目录）
-        temp_manager = MinecraftDownloadManager()
-        try:
+        with MinecraftDownloadManager() as temp_manager:
             versions = temp_manager.list_versions(version_type)
             return JSONResponse({
                 "ok": True,
                 "versions": versions,
                 "total": len(versions)
             })
-        finally:
-            temp_manager.close()
     except Exception as e:
         logger.error(f"获取版本列表失败: {e}")
         return JSONResponse({"ok": False, "error": str(e)}, status_code=500)
@@ -1489,16 +1486,13 @@ def api_mc_list_installed_versions():
             logger.info(f"📂 使用默认游戏目录: {mc_dir}")
         
         # 创建下载管理器实例
-        manager = MinecraftDownloadManager(minecraft_dir=mc_dir)
-        try:
+        with MinecraftDownloadManager(minecraft_dir=mc_dir, prefetch_manifest=False) as manager:
             versions = manager.list_installed_versions()
             return JSONResponse({
                 "ok": True,
                 "versions": versions,
                 "total": len(versions)
             })
-        finally:
-            manager.close()
     except Exception as e:
         logger.error(f"获取已安装版本列表失败: {e}")
         return JSONResponse({"ok": False, "error": str(e)}, status_code=500)
@@ -1535,6 +1529,15 @@ async def api_mc_delete_version(request: Dict = Body(...)):
         logger.info(f"🗑️ 删除版本: {version_id}, 路径: {versions_dir}")
         shutil.rmtree(versions_dir)
         
+        # 清理已删除文件的校验记录（需逐条检查数万个路径并写盘，放到线程中执行，避免阻塞事件循环）
+        verified_cache = VerifiedCache(Path(mc_dir))
+        
+        def prune_verified_cache():
+            verified_cache.prune()
+            verified_cache.save()
+        
+        await asyncio.to_thread(prune_verified_cache)
+        
         logger.info(f"✅ 版本 {version_id} 删除成功")
         return JSONResponse({"ok": True, "message": f"版本 {version_id} 已删除"})
         
@@ -1566,8 +1569,7 @@ def api_mc_get_loader_versions(loader_type: str, mc_version: str):
             return JSONResponse({"ok": False, "error": "不支持的加载器类型"}, status_code=400)
         
         # 创建临时下载管理器实例来获取加载器版本
-        temp_manager = MinecraftDownloadManager()
-        try:
+        with MinecraftDownloadManager(prefetch_manifest=False) as temp_manager:
             versions = temp_manager.get_loader_versions(loader, mc_version)
             
             if versions is None:
@@ -1584,8 +1586,6 @@ def api_mc_get_loader_versions(loader_type: str, mc_version: str):
             logger.info(f"💾 已缓存加载器版本: {cache_key}, 数量: {len(versions)}")
             
             return JSONResponse(result)
-        finally:
-            temp_manager.close()
     except Exception as e:
         logger.error(f"获取加载器版本失败: {e}")
         return JSONResponse({"ok": False, "error": str(e)}, status_code=500)
@@ -1712,23 +1712,21 @@ async def api_mc_download_vanilla(request: Dict = Body(...)):
             logger.info(f"📂 下载目录: {mc_dir}")
             
             # 创建新的下载管理器实例（使用用户配置的目录）
-            manager = MinecraftDownloadManager(
+            with MinecraftDownloadManager(
                 minecraft_dir=mc_dir,
                 max_connections=50,
                 progress_callback=progress_callback
-            )
-            try:
-                success = manager.download_vanilla(version_id, custom_name)
-                if success:
-                    logger.info(f"✅ {custom_name} 下载成功")
-                else:
-                    logger.error(f"❌ {custom_name} 下载失败")
-                return success
-            except Exception as e:
-                logger.error(f"❌ 下载异常: {e}", exc_info=True)
-                return False
-            finally:
-                manager.close()
+            ) as manager:
+                try:
+                    success = manager.download_vanilla(version_id, custom_name)
+                    if success:
+                        logger.info(f"✅ {custom_name} 下载成功")
+                    else:
+                        logger.error(f"❌ {custom_name} 下载失败")
+                    return success
+                except Exception as e:
+                    logger.error(f"❌ 下载异常: {e}", exc_info=True)
+                    return False
         
         # 提交到全局线程池
         executor = get_download_executor()
@@ -1789,17 +1787,13 @@ async def api_mc_download_with_loader(request: Dict = Body(...)):
         executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
         
         def do_download():
-            manager = MinecraftDownloadManager(
+            with MinecraftDownloadManager(
                 max_connections=50,
                 progress_callback=progress_callback
-            )
-            try:
-                success = manager.download_with_loader(
+            ) as manager:
+                return manager.download_with_loader(
                     mc_version, loader, loader_version, custom_name, fabric_api_version
                 )
-                return success
-            finally:
-                manager.close()
         
         future = executor.submit(do_download)
         
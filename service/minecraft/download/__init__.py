@@ -28,6 +28,7 @@ from .mirror_utils import MirrorManager, MirrorSource
 from .version_manifest import VersionManifest
 from .version_info import VersionInfo, RuleEvaluator
 from .http_downloader import HttpDownloader, DownloadTask
+from .verified_cache import VerifiedCache
 
 __all__ = [
     # 主要接口
@@ -50,4 +51,5 @@ __all__ = [
     # 下载器
     "HttpDownloader",
     "DownloadTask",
+    "VerifiedCache",
 ]
@@ -2,10 +2,13 @@
 Minecraft 资源文件下载器
 处理 assets（音效、语言、材质等）的下载
 """
+import os
 from pathlib import Path
 from typing import Optional, Dict, Any, Callable
 from utils.logger import logger
 from .http_downloader import HttpDownloader, DownloadTask
+from .json_utils import json_loads, atomic_write_bytes
+from .mirror_utils import MirrorConfig
 
 
 class AssetDownloader:
@@ -60,18 +63,25 @@ class AssetDownloader:
             progress_callback("index", 0, 1)
         
         index_file = self.indexes_dir / f"{asset_id}.json"
-        if not self.downloader.download_file(asset_url, index_file, asset_sha1):
-            logger.error("下载资源索引失败")
-            return False
+        index_bytes = None
+        if not self.downloader.verify_file(index_file, asset_sha1):
+            # 镜像与官方源并发请求，取最先校验通过的结果
+            index_bytes = self.downloader.fetch_bytes_racing(asset_url, asset_sha1)
+            if index_bytes is not None:
+                atomic_write_bytes(index_file, index_bytes)
+            elif not self.downloader.download_file(asset_url, index_file, asset_sha1):
+                # 两个来源都失败时走常规的重试流程
+                logger.error("下载资源索引失败")
+                return False
         
         if progress_callback:
             progress_callback("index", 1, 1)
         
-        # 2. 解析索引文件
-        import json
+        # 2. 解析索引文件（刚下载的直接使用内存中的字节，否则一次读取全部字节再解析）
         try:
-            with open(index_file, "r", encoding="utf-8") as f:
-                index_data = json.load(f)
+            if index_bytes is None:
+                index_bytes = index_file.read_bytes()
+            index_data = json_loads(index_bytes)
         except Exception as e:
             logger.error(f"解析资源索引失败: {e}")
             return False
@@ -84,46 +94,89 @@ class AssetDownloader:
         if total_objects == 0:
             return True
         
-        # 创建下载任务
-        download_tasks = []
-        for asset_name, asset_info in objects.items():
-            hash_value = asset_info.get("hash")
-            size = asset_info.get("size", 0)
-            
-            if not hash_value:
-                continue
-            
-            # 资源 URL 格式: https://resources.download.minecraft.net/<前2位hash>/<完整hash>
-            asset_url = f"https://resources.download.minecraft.net/{hash_value[:2]}/{hash_value}"
-            
-            # 保存路径: objects/<前2位hash>/<完整hash>
-            save_path = self.objects_dir / hash_value[:2] / hash_value
-            
-            task = DownloadTask(
-                url=asset_url,
-                save_path=save_path,
-                sha1=hash_value,
-                description=f"Asset: {asset_name}"
-            )
-            download_tasks.append(task)
+        # 一次遍历 objects 目录（256 个分片）取得已有文件，代替逐个对象 stat；
+        # 已校验且未变化的对象直接计为完成，不再创建下载任务
+        existing = self._scan_objects()
+        verified_cache = self.downloader.verified_cache
+        # 计数：已校验跳过 / 已下载完成（进度回调在 download_batch 的调用线程中执行，无需加锁）
+        counts = {"skipped": 0, "completed": 0}
+        
+        assets_base_url = MirrorConfig.ASSETS_BASE_URL
+        
+        def iter_tasks():
+            """按需生成下载任务，边生成边提交，无需先构建完整任务列表"""
+            for asset_name, asset_info in objects.items():
+                hash_value = asset_info.get("hash")
+                
+                if not hash_value:
+                    continue
+                
+                entry = existing.get(hash_value)
+                if entry is not None and verified_cache is not None:
+                    try:
+                        if verified_cache.is_verified(entry.path, hash_value, entry.stat()):
+                            counts["skipped"] += 1
+                            continue
+                    except OSError:
+                        pass
+                
+                # 资源 URL 格式: https://resources.download.minecraft.net/<前2位hash>/<完整hash>
+                # （保留官方地址，镜像转换与回退由 download_file 按 mirror_key 处理）
+                # 保存路径: objects/<前2位hash>/<完整hash>
+                prefix = hash_value[:2]
+                yield DownloadTask(
+                    url=f"{assets_base_url}{prefix}/{hash_value}",
+                    save_path=self.objects_dir / prefix / hash_value,
+                    sha1=hash_value,
+                    description=f"Asset: {asset_name}",
+                    mirror_key=prefix
+                )
         
         # 批量下载
         def batch_progress(task: DownloadTask):
-            completed = sum(1 for t in download_tasks if t.status == "completed")
+            if task.status == "failed":
+                logger.warning(f"✗ {task.description}")
+                return
+            
+            counts["completed"] += 1
+            completed = counts["skipped"] + counts["completed"]
             if progress_callback:
                 progress_callback("objects", completed, total_objects)
             
             # 每 50 个文件输出一次日志
-            if task.status == "completed" and completed % 50 == 0:
+            if completed % 50 == 0:
                 logger.info(f"✅ 已下载 {completed}/{total_objects} 个资源文件")
-            elif task.status == "failed":
-                logger.warning(f"✗ {task.description}")
         
-        result = self.downloader.download_batch(download_tasks, batch_progress)
+        result = self.downloader.download_batch(iter_tasks(), batch_progress)
         
+        if counts["skipped"]:
+            logger.info(f"已跳过 {counts['skipped']} 个已校验的资源文件")
         logger.info(
-            f"资源下载完成: 成功 {result['completed']}/{result['total']}, "
+            f"资源下载完成: 成功 {counts['skipped'] + result['completed']}/{counts['skipped'] + result['total']}, "
             f"失败 {result['failed']}"
         )
         
         return result["failed"] == 0
+    
+    def _scan_objects(self) -> Dict[str, os.DirEntry]:
+        """
+        遍历 objects 目录，返回已有资源文件（哈希 → DirEntry）
+        
+        Windows 上 DirEntry.stat() 直接使用目录遍历时取得的信息，无需额外系统调用。
+        
+        Returns:
+            已存在的资源文件
+        """
+        existing: Dict[str, os.DirEntry] = {}
+        try:
+            with os.scandir(self.objects_dir) as shards:
+                for shard in shards:
+                    if not shard.is_dir():
+                        continue
+                    with os.scandir(shard.path) as entries:
+                        for entry in entries:
+                            if entry.is_file():
+                                existing[entry.name] = entry
+        except OSError as e:
+            logger.debug(f"遍历资源目录失败: {e}")
+        return existing
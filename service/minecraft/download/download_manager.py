@@ -2,10 +2,21 @@
 Minecraft 下载管理器
 整合所有下载模块，提供统一的下载接口
 """
-import json
+import asyncio
+import concurrent.futures
+import inspect
+import logging
+import os
+import platform
+import re
+import shutil
+import threading
+import time
+import traceback
 from pathlib import Path
-from typing import Optional, Callable, Dict, Any
+from typing import Optional, Callable, Dict, Any, Set
 from utils.logger import logger
+from utils.httpx import get_session
 from .mirror_utils import MirrorManager
 from .http_downloader import HttpDownloader
 from .version_manifest import VersionManifest
@@ -15,6 +26,134 @@ from .library_downloader import LibraryDownloader
 from .asset_downloader import AssetDownloader
 from .loader_support import LoaderManager, LoaderType
 from .forge_installer import ForgeInstaller
+from .verified_cache import VerifiedCache
+from .json_utils import json_loads, json_dumps, atomic_write_bytes
+
+
+# 加载器关键字表（按优先级排列；neoforge 必须在 forge 之前，因为 "neoforge" 包含 "forge"）
+# net.fabricmc / net.neoforged / net.minecraftforge 已分别被 fabric / neoforge / forge 覆盖
+_LOADER_KEYWORDS = (
+    ("fabric", "fabric"),
+    ("neoforge", "neoforge"),
+    ("forge", "forge"),
+    ("optifine", "optifine"),
+)
+
+# 库名关键字表（库名中仅 net.fabricmc 与 fabric-loader 表示 Fabric 加载器）
+_LIBRARY_LOADER_KEYWORDS = (
+    ("net.fabricmc", "fabric"),
+    ("fabric-loader", "fabric"),
+    ("neoforge", "neoforge"),
+    ("forge", "forge"),
+    ("optifine", "optifine"),
+)
+
+# 官方非正式版类型（原样返回，其余归为 release）
+_NON_RELEASE_TYPES = frozenset(("snapshot", "old_beta", "old_alpha"))
+
+
+def _match_loader(text: str, keywords: tuple) -> Optional[str]:
+    """
+    按关键字表匹配加载器类型
+    
+    Args:
+        text: 已转换为小写的待匹配文本
+        keywords: (关键字, 加载器类型) 元组
+        
+    Returns:
+        第一个命中的加载器类型，未命中返回 None
+    """
+    for keyword, loader in keywords:
+        if keyword in text:
+            return loader
+    return None
+
+
+def _match_loader_in_args(args: list) -> Optional[str]:
+    """
+    逐个参数匹配加载器类型（命中即返回）
+    
+    Args:
+        args: arguments.game / arguments.jvm 列表，元素为字符串或带 rules 的 {"value": ...} 对象
+        
+    Returns:
+        第一个命中的加载器类型，未命中返回 None
+    """
+    for arg in args:
+        if isinstance(arg, dict):
+            value = arg.get("value", "")
+            values = value if isinstance(value, list) else (value,)
+        else:
+            values = (arg,)
+        
+        for value in values:
+            if isinstance(value, str):
+                loader = _match_loader(value.lower(), _LOADER_KEYWORDS)
+                if loader:
+                    return loader
+    return None
+
+
+# Windows 常见 Java 安装位置（安装目录, 子目录），按优先级排列
+_WINDOWS_JAVA_CANDIDATES = (
+    ("C:\\Program Files\\Java", "jdk-17"),
+    ("C:\\Program Files\\Java", "jre-17"),
+    ("C:\\Program Files\\Eclipse Adoptium", "jdk-17"),
+    ("C:\\Program Files\\Eclipse Adoptium", "jre-17"),
+    ("C:\\Program Files (x86)\\Java", "jdk-17"),
+    ("C:\\Program Files (x86)\\Java", "jre-17"),
+    ("C:\\Program Files\\Java", "jdk-21"),
+    ("C:\\Program Files\\Eclipse Adoptium", "jdk-21"),
+)
+
+
+# 快照版本 ID 特征：snapshot、预发布（pre）、候选版（rc）、周快照（如 23w45a）
+_SNAPSHOT_ID_RE = re.compile(r"snapshot|pre|rc|\d+w\d+", re.IGNORECASE)
+
+
+# 加载器安装器生成的标准版本名（用户自定义名称不一定反映真实加载器，不走此捷径）
+# 如 fabric-loader-0.15.7-1.20.1、1.20.1-forge-47.2.0、neoforge-20.4.80、1.20.1-OptiFine_HD_U_I6
+_CANONICAL_LOADER_ID_RE = re.compile(
+    r"(?P<fabric>fabric-loader-\d[\w.+-]*-\d[\w.-]*)"
+    r"|(?P<neoforge>neoforge-\d[\w.+-]*)"
+    r"|(?P<forge>\d[\w.-]*-forge-\d[\w.+-]*)"
+    r"|(?P<optifine>\d[\w.-]*-OptiFine_\w+)"
+)
+
+
+def _guess_type_from_id(version_id: str) -> str:
+    """
+    仅根据版本 ID 推断版本类型（读取版本 JSON 失败时使用）
+    
+    Args:
+        version_id: 版本 ID（目录名）
+        
+    Returns:
+        版本类型: fabric, neoforge, forge, optifine, snapshot, release
+    """
+    loader = _match_loader(version_id.lower(), _LOADER_KEYWORDS)
+    if loader:
+        return loader
+    if _SNAPSHOT_ID_RE.search(version_id):
+        return "snapshot"
+    return "release"
+
+
+def _base_coord(name: str) -> str:
+    """
+    提取 Maven 坐标的 group:artifact 部分（用于库去重）
+    
+    Args:
+        name: 库名称，如 org.ow2.asm:asm:9.6
+        
+    Returns:
+        group:artifact，坐标不完整时返回空字符串
+    """
+    group, _, rest = name.partition(":")
+    artifact = rest.partition(":")[0]
+    if group and artifact:
+        return f"{group}:{artifact}"
+    return ""
 
 
 class DownloadProgress:
@@ -39,11 +178,28 @@ class DownloadProgress:
 class MinecraftDownloadManager:
     """Minecraft 下载管理器"""
     
+    IO_POOL_WORKERS = 4  # 并行下载阶段数（具体文件并发由 HttpDownloader 控制）
+    PROGRESS_INTERVAL = 0.033  # 进度回调最小间隔（秒），约 30 次/秒
+    PROGRESS_LOG_INTERVAL = 0.1  # 同一阶段进度日志最小间隔（秒）
+    PROGRESS_STEPS = 200  # 逐文件进度按总数的 1/200 抽样转发，日志按同一步长限流
+    
+    # 原版下载涉及的主机（客户端 JAR、依赖库、资源文件），开始下载时预先建立连接
+    PREWARM_URLS = (
+        "https://piston-data.mojang.com/",
+        "https://libraries.minecraft.net/",
+        "https://resources.download.minecraft.net/",
+    )
+    
+    # 已安装版本信息缓存：版本 JSON 路径 → ((mtime_ns, size), 版本信息)
+    # 管理器实例随请求创建，因此在类上进程内共享
+    _version_entry_cache: Dict[str, tuple] = {}
+    
     def __init__(
         self,
         minecraft_dir: Optional[Path] = None,
         max_connections: int = None,  # None 表示自动计算
-        progress_callback: Optional[Callable[[DownloadProgress], None]] = None
+        progress_callback: Optional[Callable[[DownloadProgress], None]] = None,
+        prefetch_manifest: bool = True
     ):
         """
         初始化下载管理器
@@ -52,6 +208,7 @@ class MinecraftDownloadManager:
             minecraft_dir: Minecraft 目录，None 则使用默认路径
             max_connections: 最大并发连接数，None 则根据 CPU 自动计算
             progress_callback: 进度回调函数
+            prefetch_manifest: 是否在后台预取版本清单
         """
         # 设置 Minecraft 目录
         if minecraft_dir is None:
@@ -63,21 +220,25 @@ class MinecraftDownloadManager:
         else:
             self.minecraft_dir = Path(minecraft_dir)
         
-        self.minecraft_dir.mkdir(parents=True, exist_ok=True)
+        # 本实例已确认存在的目录（管理器生命周期仅覆盖一次安装，不会失效）
+        self._ensured_dirs: Set[Path] = set()
+        self._ensure_dir(self.minecraft_dir)
         
         # 自动计算连接数
         if max_connections is None:
-            import os
             cpu_count = os.cpu_count() or 4
-            # 连接数 = CPU核心数 * 4，但不超过 100
-            max_connections = min(cpu_count * 4, 100)
+            # 连接数 = CPU核心数 * 4，最少 32（下载是 IO 密集型，低核心机器也需要足够的在途请求
+            # 才能填满 HTTP/2 连接），但不超过 100
+            max_connections = min(max(cpu_count * 4, 32), 100)
             logger.info(f"🔧 CPU 核心数: {cpu_count}, HTTP 连接数: {max_connections}")
         
         # 初始化组件
         self.mirror_manager = MirrorManager()
+        self.verified_cache = VerifiedCache(self.minecraft_dir)
         self.downloader = HttpDownloader(
             max_connections=max_connections,
-            mirror_manager=self.mirror_manager
+            mirror_manager=self.mirror_manager,
+            verified_cache=self.verified_cache
         )
         
         self.version_manifest = VersionManifest(
@@ -90,9 +251,45 @@ class MinecraftDownloadManager:
         self.asset_downloader = AssetDownloader(self.minecraft_dir, self.downloader)
         self.loader_manager = LoaderManager(self.downloader)
         
-        # 进度回调
-        self.progress_callback = progress_callback
+        # 共享线程池：并行执行依赖库/资源等下载阶段，整个管理器生命周期内复用
+        self._io_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.IO_POOL_WORKERS,
+            thread_name_prefix="mc-dl"
+        )
+        
+        # 第三方 API（Modrinth 等）复用全局连接池，避免每次请求重新握手
+        self._http_client = get_session()
+        
         self.progress = DownloadProgress()
+        
+        self._closed = False
+        
+        # 已找到的 Java 路径（未找到时不缓存，安装 Java 后下次查找即可生效）
+        self._java_path: Optional[str] = None
+        
+        # 异步调用方的事件循环（注册回调或 *_async 接口时记录，用于投递协程回调）
+        self._callback_loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # 进度回调由后台线程合并发送：工作线程只更新进度并置位事件，
+        # 回调最多每 PROGRESS_INTERVAL 秒触发一次，且总是拿到最新进度
+        self._progress_event = threading.Event()
+        self._progress_thread: Optional[threading.Thread] = None
+        # 最近一次投递到事件循环的协程回调（保证同时最多只有一个在执行）
+        self._callback_future: Optional[concurrent.futures.Future] = None
+        self.set_progress_callback(progress_callback)
+        
+        # 各阶段上次输出进度日志的 (时间, 进度)，用于日志限流
+        self._last_progress_log: Dict[str, tuple] = {}
+        
+        # 后台预取版本清单，与用户选择版本等操作重叠
+        self._manifest_thread: Optional[threading.Thread] = None
+        if prefetch_manifest:
+            self._manifest_thread = threading.Thread(
+                target=self.version_manifest.load_manifest,
+                name="ManifestPrefetch",
+                daemon=True
+            )
+            self._manifest_thread.start()
     
     def download_vanilla(
         self,
@@ -114,13 +311,17 @@ class MinecraftDownloadManager:
         
         logger.info(f"==================== 开始下载 Minecraft {version_id} ====================")
         logger.info(f"📂 下载目录: {self.minecraft_dir}")
-        logger.info(f"✓ 目录是否存在: {self.minecraft_dir.exists()}")
         if custom_name:
             logger.info(f"📝 自定义名称: {final_name}")
         
         try:
+            # 加载清单和版本 JSON（走共享的元数据连接）期间，后台为文件下载连接完成握手
+            # （预热请求在下载器自己的线程池中执行，不占用下载阶段线程池）
+            self.downloader.prewarm(self.PREWARM_URLS)
+            
             # 1. 加载版本清单
             self._update_progress("version_manifest", 0, 1, "正在加载版本清单...")
+            self._wait_manifest_prefetch()
             if not self.version_manifest.load_manifest():
                 logger.error("加载版本清单失败")
                 return False
@@ -156,13 +357,24 @@ class MinecraftDownloadManager:
             version_info.save_version_json()
             self._update_progress("version_info", 1, 1, "版本信息获取完成")
             
-            # 3. 下载客户端 JAR（使用 version_info 的路径，确保文件名正确）
-            self._update_progress("client_jar", 0, 1, "正在下载客户端 JAR...")
             client_info = version_info.get_client_download_info()
             if not client_info:
                 logger.error("获取客户端下载信息失败")
                 return False
             
+            # 3. 版本 JSON 到手后立即把依赖库和资源文件（含资源索引请求）提交到线程池，
+            #    与客户端 JAR 在同一 HTTP/2 连接上并发进行，而不是等 JAR 下载完再开始
+            libraries = version_info.get_libraries(filter_by_rules=True)
+            asset_index_info = version_info.get_asset_index_info()
+            
+            lib_future = self._io_pool.submit(self._download_libraries, version_info, libraries)
+            asset_future = None
+            if asset_index_info:
+                asset_future = self._io_pool.submit(self._download_assets, asset_index_info)
+            
+            # 4. 在当前线程下载客户端 JAR（使用 version_info 的路径，确保文件名正确）
+            self._update_progress("client_jar", 0, 1, "正在下载客户端 JAR...")
+            
             def client_progress(downloaded, total):
                 self._update_progress(
                     "client_jar",
@@ -182,45 +394,39 @@ class MinecraftDownloadManager:
                 url=url,
                 save_path=jar_path,
                 sha1=sha1,
+                size=client_info.get("size"),
                 use_mirror=True,
                 progress_callback=client_progress
             )
             
             if not success:
                 logger.error("客户端 JAR 下载失败")
+                # 取消尚未开始的任务，并等待已在运行的任务结束后再返回
+                pending = [f for f in (lib_future, asset_future) if f is not None]
+                for future in pending:
+                    future.cancel()
+                concurrent.futures.wait(pending)
                 return False
             
             self._update_progress("client_jar", 1, 1, "客户端 JAR 下载完成")
             
-            # 4. 并行下载依赖库和资源文件
-            libraries = version_info.get_libraries(filter_by_rules=True)
-            asset_index_info = version_info.get_asset_index_info()
+            # 等待依赖库下载完成
+            lib_success = lib_future.result()
+            if lib_success:
+                logger.info("📦 依赖库下载完成")
+            else:
+                logger.warning("部分依赖库下载失败")
             
-            # 使用线程池并行下载
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-                # 提交依赖库下载任务
-                lib_future = executor.submit(self._download_libraries, version_info, libraries)
-                
-                # 提交资源文件下载任务
-                asset_future = None
-                if asset_index_info:
-                    asset_future = executor.submit(self._download_assets, asset_index_info)
-                
-                # 等待依赖库下载完成
-                lib_success = lib_future.result()
-                if lib_success:
-                    logger.info("📦 依赖库下载完成")
+            # 等待资源文件下载完成
+            if asset_future:
+                asset_success = asset_future.result()
+                if asset_success:
+                    logger.info("🎨 资源文件下载完成")
                 else:
-                    logger.warning("部分依赖库下载失败")
-                
-                # 等待资源文件下载完成
-                if asset_future:
-                    asset_success = asset_future.result()
-                    if asset_success:
-                        logger.info("🎨 资源文件下载完成")
-                    else:
-                        logger.warning("部分资源文件下载失败")
+                    logger.warning("部分资源文件下载失败")
+            
+            # 保存已校验文件记录，下次安装可直接跳过哈希计算
+            self.verified_cache.save()
             
             # 完成
             self._update_progress("complete", 1, 1, f"✓ {final_name} 下载完成！")
@@ -228,10 +434,31 @@ class MinecraftDownloadManager:
             return True
         
         except Exception as e:
-            logger.error(f"下载过程发生异常: {e}", exc_info=True)
+            logger.error("下载过程发生异常: %s", e, exc_info=True)
             self._update_progress("error", 0, 0, f"下载失败: {e}")
             return False
     
+    async def download_vanilla_async(
+        self,
+        version_id: str,
+        custom_name: Optional[str] = None
+    ) -> bool:
+        """
+        下载原版 Minecraft（异步接口）
+        
+        在工作线程中执行下载，不阻塞调用方的事件循环；
+        协程进度回调会被投递回调用方的事件循环执行。
+        
+        Args:
+            version_id: 版本 ID（如 1.20.1）
+            custom_name: 自定义版本名称
+            
+        Returns:
+            是否下载成功
+        """
+        self._callback_loop = asyncio.get_running_loop()
+        return await asyncio.to_thread(self.download_vanilla, version_id, custom_name)
+    
     def download_with_loader(
         self,
         mc_version: str,
@@ -257,14 +484,12 @@ class MinecraftDownloadManager:
             logger.info(f"📝 自定义名称: {custom_name}")
         
         try:
-            # 1. 先下载原版（使用自定义名称）
-            if not self.download_vanilla(mc_version, custom_name):
-                return False
-            
-            # 2. 获取加载器配置
-            self._update_progress("loader_info", 0, 1, f"正在获取 {loader_type.value} 配置...")
-            
+            # 1. Fabric：先获取配置，再让 Fabric 依赖库（Fabric Maven）和 Fabric API（Modrinth）
+            #    在线程池中与原版下载（Mojang/镜像）并行，三者互不依赖
+            fabric_futures = []
             if loader_type == LoaderType.FABRIC:
+                self._update_progress("loader_info", 0, 1, f"正在获取 {loader_type.value} 配置...")
+                
                 profile = self.loader_manager.fabric.get_profile_json(
                     mc_version,
                     loader_version
@@ -277,156 +502,52 @@ class MinecraftDownloadManager:
                 self._update_progress("loader_info", 1, 1, "Fabric 配置获取成功")
                 logger.info("Fabric 配置获取成功")
                 
-                # 3. 下载 Fabric 依赖库
+                # Fabric的库下载到全局libraries目录（不是版本专属目录）
                 fabric_libraries = profile.get("libraries", [])
                 if fabric_libraries:
-                    total_libs = len(fabric_libraries)
-                    self._update_progress("loader_libraries", 0, total_libs, f"正在下载 Fabric 依赖库 (共 {total_libs} 个)...")
-                    
-                    def fabric_lib_progress(current, total):
-                        self._update_progress(
-                            "loader_libraries",
-                            current,
-                            total,
-                            f"正在下载 Fabric 依赖库: {current}/{total}"
-                        )
-                    
-                    logger.info(f"Fabric 依赖库数量: {len(fabric_libraries)}")
-                    
-                    # Fabric的库下载到全局libraries目录（不是版本专属目录）
-                    # 所有版本共享libraries
-                    success = self.library_downloader.download_libraries(
-                        fabric_libraries,
-                        None,  # Fabric的库不需要natives解压
-                        fabric_lib_progress
+                    fabric_futures.append(
+                        self._io_pool.submit(self._download_fabric_libraries, fabric_libraries)
                     )
-                    
-                    if success:
-                        self._update_progress("loader_libraries", total_libs, total_libs, "Fabric 依赖库下载完成")
-                        logger.info("📦 Fabric 依赖库下载完成")
-                    else:
-                        logger.warning("部分 Fabric 依赖库下载失败")
                 
-                # 4. 如果选择了 Fabric API，下载到版本专属的 mods 目录
+                # 如果选择了 Fabric API，下载到版本专属的 mods 目录
                 # 根据版本隔离要求，每个版本有独立的 mods 目录
                 if fabric_api_version:
-                    self._update_progress("fabric_api", 0, 1, "正在下载 Fabric API...")
-                    
-                    # 注意：这里需要先计算version_dir_name（在步骤5中定义）
-                    # 为了避免重复计算，我们这里直接使用custom_name
                     version_dir_for_mods = custom_name if custom_name else f"fabric-loader-{loader_version}-{mc_version}"
-                    # 版本隔离：mods 目录在版本专属目录下
                     version_mods_dir = self.minecraft_dir / "versions" / version_dir_for_mods / "mods"
-                    version_mods_dir.mkdir(parents=True, exist_ok=True)
-                    
-                    logger.info(f"📂 版本专属 mods 目录: {version_mods_dir}")
-                    
-                    # 从 Modrinth 获取 Fabric API 下载链接
-                    try:
-                        from utils.httpx import get_session
-                        client = get_session()
-                        
-                        # Fabric API 的 Modrinth ID
-                        fabric_api_id = "P7dR8mSH"
-                        url = f"https://api.modrinth.com/v2/project/{fabric_api_id}/version"
-                        
-                        # 增加超时时间，并添加重试机制
-                        retry_count = 3
-                        versions_data = None
-                        
-                        for attempt in range(retry_count):
-                            try:
-                                response = client.get(url, timeout=15.0)
-                                if response.status_code == 200:
-                                    versions_data = response.json()
-                                    break
-                                else:
-                                    logger.warning(f"Modrinth API 请求失败: {response.status_code} (重试 {attempt+1}/{retry_count})")
-                                    import time
-                                    time.sleep(1)
-                            except Exception as e:
-                                logger.warning(f"Modrinth API 请求异常: {e} (重试 {attempt+1}/{retry_count})")
-                                import time
-                                time.sleep(1)
-                        
-                        if versions_data:
-                            # 查找匹配的版本
-                            target_version = None
-                            for version in versions_data:
-                                if version.get("version_number") == fabric_api_version:
-                                    target_version = version
-                                    break
-                            
-                            if target_version and target_version.get("files"):
-                                # 获取主文件
-                                primary_file = None
-                                for file in target_version["files"]:
-                                    if file.get("primary", False):
-                                        primary_file = file
-                                        break
-                                
-                                if not primary_file and target_version["files"]:
-                                    primary_file = target_version["files"][0]
-                                
-                                if primary_file:
-                                    download_url = primary_file.get("url")
-                                    # 尝试使用镜像
-                                    if download_url:
-                                        download_url = self.mirror_manager.get_download_url(download_url)
-                                        
-                                    filename = primary_file.get("filename")
-                                    
-                                    if download_url and filename:
-                                        # 下载 Fabric API jar 到版本专属 mods 目录
-                                        fabric_api_path = version_mods_dir / filename
-                                        
-                                        logger.info(f"下载 Fabric API: {filename}")
-                                        
-                                        # 下载文件重试机制
-                                        download_success = False
-                                        for attempt in range(retry_count):
-                                            try:
-                                                file_response = client.get(download_url, timeout=30.0)
-                                                if file_response.status_code == 200:
-                                                    with open(fabric_api_path, "wb") as f:
-                                                        f.write(file_response.content)
-                                                    download_success = True
-                                                    break
-                                                else:
-                                                    logger.warning(f"Fabric API 下载失败: {file_response.status_code} (重试 {attempt+1}/{retry_count})")
-                                            except Exception as e:
-                                                logger.warning(f"Fabric API 下载异常: {e} (重试 {attempt+1}/{retry_count})")
-                                        
-                                        if download_success:
-                                            logger.info(f"✅ Fabric API 已下载到: {fabric_api_path}")
-                                            self._update_progress("fabric_api", 1, 1, "Fabric API 下载完成")
-                                        else:
-                                            logger.error("Fabric API 下载最终失败")
-                                    else:
-                                        logger.error("Fabric API 文件信息不完整")
-                                else:
-                                    logger.error("Fabric API 没有有效的下载文件")
-                            else:
-                                logger.error(f"未找到 Fabric API 版本: {fabric_api_version}")
-                        else:
-                            logger.error("无法获取 Fabric API 版本列表")
-                    except Exception as e:
-                        logger.error(f"下载 Fabric API 失败: {e}")
-                
-                # 5. 创建 Fabric 版本 JSON
-                # 有自定义名称：完全合并（像 PCL 那样）
-                # 无自定义名称：使用 inheritsFrom 继承
-                
-                # 5. 创建 Fabric 版本 JSON（完全合并模式，与 Forge 一致）
-                import shutil
+                    fabric_futures.append(
+                        self._io_pool.submit(
+                            self._download_fabric_api, mc_version, fabric_api_version, version_mods_dir
+                        )
+                    )
+            
+            # 2. 下载原版（使用自定义名称）
+            if not self.download_vanilla(mc_version, custom_name):
+                # 取消尚未开始的 Fabric 任务，并等待已在运行的任务结束，记录其异常后再返回
+                for future in fabric_futures:
+                    future.cancel()
+                concurrent.futures.wait(fabric_futures)
+                for future in fabric_futures:
+                    if not future.cancelled() and future.exception() is not None:
+                        logger.warning("Fabric 下载任务异常: %s", future.exception())
+                return False
+            
+            if loader_type != LoaderType.FABRIC:
+                # 获取加载器配置
+                self._update_progress("loader_info", 0, 1, f"正在获取 {loader_type.value} 配置...")
+            
+            if loader_type == LoaderType.FABRIC:
+                # 3. 等待 Fabric 依赖库和 Fabric API 下载完成
+                for future in fabric_futures:
+                    future.result()
                 
+                # 4. 创建 Fabric 版本 JSON（完全合并模式，与 Forge 一致）
                 # 确定最终版本名称
                 final_name = custom_name.strip() if custom_name else f"fabric-loader-{loader_version}-{mc_version}"
                 
                 logger.info(f"🔧 使用完全合并模式安装 Fabric")
                 
                 version_dir = self.minecraft_dir / "versions" / final_name
-                version_dir.mkdir(parents=True, exist_ok=True)
+                self._ensure_dir(version_dir)
                 
                 # 读取原版MC的JSON
                 mc_json_path = version_dir / f"{mc_version}.json"
@@ -437,11 +558,16 @@ class MinecraftDownloadManager:
                     return False
                 
                 try:
-                    with open(mc_json_path, "r", encoding="utf-8") as f:
-                        mc_data = json.load(f)
+                    with open(mc_json_path, "rb") as f:
+                        mc_data = json_loads(f.read())
                     
                     # 以MC原版为基础，合并Fabric配置
+                    # 浅拷贝后只复制下面会被原地修改的 arguments 容器，避免 extend 改动 mc_data
+                    # （libraries 在下面整体重建，无需复制）
                     merged_data = mc_data.copy()
+                    merged_data["arguments"] = {
+                        arg_type: list(args) for arg_type, args in mc_data.get("arguments", {}).items()
+                    }
                     merged_data["id"] = final_name
                     merged_data["type"] = "fabric"
                     merged_data["mainClass"] = profile.get("mainClass")
@@ -451,8 +577,6 @@ class MinecraftDownloadManager:
                         del merged_data["inheritsFrom"]
                     
                     # 合并arguments
-                    if "arguments" not in merged_data:
-                        merged_data["arguments"] = {}
                     if "arguments" in profile:
                         for arg_type in ["game", "jvm"]:
                             if arg_type in profile["arguments"]:
@@ -461,36 +585,33 @@ class MinecraftDownloadManager:
                                 merged_data["arguments"][arg_type].extend(profile["arguments"][arg_type])
                     
                     # 合并libraries（去重，优先使用Fabric的高版本库）
-                    if "libraries" not in merged_data:
-                        merged_data["libraries"] = []
-                    
                     # 构建MC库的名称集合（用于去重）
+                    mc_libraries = mc_data.get("libraries", [])
                     mc_lib_names = {}
-                    for lib in merged_data["libraries"]:
-                        lib_name = lib.get("name", "")
-                        if lib_name:
-                            parts = lib_name.split(":")
-                            if len(parts) >= 2:
-                                base_name = f"{parts[0]}:{parts[1]}"
-                                mc_lib_names[base_name] = lib
+                    for lib in mc_libraries:
+                        base_name = _base_coord(lib.get("name", ""))
+                        if base_name:
+                            mc_lib_names[base_name] = lib
                     
                     # 添加Fabric库，如果有冲突则覆盖
+                    # 先收集被覆盖的库，再一次性重建列表（避免逐个 list.remove 的 O(N·M)）
+                    replaced_libs = set()
                     for fabric_lib in fabric_libraries:
                         lib_name = fabric_lib.get("name", "")
-                        if lib_name:
-                            parts = lib_name.split(":")
-                            if len(parts) >= 2:
-                                base_name = f"{parts[0]}:{parts[1]}"
-                                if base_name in mc_lib_names:
-                                    old_lib = mc_lib_names[base_name]
-                                    merged_data["libraries"].remove(old_lib)
-                                    logger.info(f"⚠️ 库冲突，使用Fabric版本: {lib_name}")
-                        merged_data["libraries"].append(fabric_lib)
+                        base_name = _base_coord(lib_name)
+                        if base_name in mc_lib_names:
+                            replaced_libs.add(id(mc_lib_names[base_name]))
+                            logger.info(f"⚠️ 库冲突，使用Fabric版本: {lib_name}")
+                    
+                    if replaced_libs:
+                        mc_libraries = [lib for lib in mc_libraries if id(lib) not in replaced_libs]
+                    # 列表拼接按最终长度一次分配
+                    merged_data["libraries"] = mc_libraries + fabric_libraries
                     
                     # 保存合并后JSON（使用版本名作为文件名）
+                    # 先写临时文件再原子替换，进程中断也不会留下半截的版本 JSON
                     final_json_path = version_dir / f"{final_name}.json"
-                    with open(final_json_path, "w", encoding="utf-8") as f:
-                        json.dump(merged_data, f, ensure_ascii=False, indent=2)
+                    atomic_write_bytes(final_json_path, json_dumps(merged_data, indent=False))
                     
                     logger.info(f"✅ Fabric 版本已创建: {final_json_path.name}")
                     logger.info(f"🎮 mainClass: {merged_data.get('mainClass')}")
@@ -498,21 +619,24 @@ class MinecraftDownloadManager:
                     
                     # 处理文件重命名（与 Forge 一致）
                     # 重命名 JAR
+                    # 直接重命名/删除，由异常判断文件是否存在，省去额外的 stat
                     old_jar = version_dir / f"{mc_version}.jar"
                     final_jar = version_dir / f"{final_name}.jar"
-                    if old_jar.exists() and not final_jar.exists():
-                        old_jar.rename(final_jar)
-                        logger.info(f"✅ 已重命名 JAR: {mc_version}.jar → {final_name}.jar")
+                    if old_jar != final_jar:
+                        try:
+                            old_jar.rename(final_jar)
+                            logger.info(f"✅ 已重命名 JAR: {mc_version}.jar → {final_name}.jar")
+                        except (FileNotFoundError, FileExistsError):
+                            pass
                     
                     # 删除原版 JSON（避免混淆）
-                    if mc_json_path.exists() and mc_json_path != final_json_path:
-                        mc_json_path.unlink()
+                    if mc_json_path != final_json_path:
+                        mc_json_path.unlink(missing_ok=True)
                         logger.info(f"🗑️ 已删除原版 JSON: {mc_version}.json")
                     
                 except Exception as e:
                     error_msg = f"合并 Fabric 配置失败: {e}"
                     logger.error(error_msg)
-                    import traceback
                     logger.error(traceback.format_exc())
                     self._update_progress("error", 0, 0, error_msg)
                     return False
@@ -564,7 +688,8 @@ class MinecraftDownloadManager:
                 forge_installer = ForgeInstaller(
                     minecraft_dir=self.minecraft_dir,
                     downloader=self.downloader,
-                    progress_callback=forge_progress_callback
+                    progress_callback=forge_progress_callback,
+                    executor=self._io_pool
                 )
                 
                 # 查找 Java 路径
@@ -629,7 +754,8 @@ class MinecraftDownloadManager:
                 neoforge_installer = ForgeInstaller(
                     minecraft_dir=self.minecraft_dir,
                     downloader=self.downloader,
-                    progress_callback=neoforge_progress_callback
+                    progress_callback=neoforge_progress_callback,
+                    executor=self._io_pool
                 )
                 
                 # 查找 Java 路径
@@ -655,10 +781,37 @@ class MinecraftDownloadManager:
             return True
         
         except Exception as e:
-            logger.error(f"下载加载器版本失败: {e}", exc_info=True)
+            logger.error("下载加载器版本失败: %s", e, exc_info=True)
             self._update_progress("error", 0, 0, f"下载失败: {e}")
             return False
     
+    async def download_with_loader_async(
+        self,
+        mc_version: str,
+        loader_type: LoaderType,
+        loader_version: str,
+        custom_name: Optional[str] = None,
+        fabric_api_version: Optional[str] = None
+    ) -> bool:
+        """
+        下载带加载器的版本（异步接口）
+        
+        Args:
+            mc_version: Minecraft 版本
+            loader_type: 加载器类型
+            loader_version: 加载器版本
+            custom_name: 自定义版本名称
+            fabric_api_version: Fabric API 版本
+            
+        Returns:
+            是否下载成功
+        """
+        self._callback_loop = asyncio.get_running_loop()
+        return await asyncio.to_thread(
+            self.download_with_loader,
+            mc_version, loader_type, loader_version, custom_name, fabric_api_version
+        )
+    
     def list_versions(self, version_type: Optional[str] = None) -> list:
         """
         列出所有可用版本
@@ -669,6 +822,7 @@ class MinecraftDownloadManager:
         Returns:
             版本列表
         """
+        self._wait_manifest_prefetch()
         if not self.version_manifest.load_manifest():
             return []
         
@@ -696,12 +850,14 @@ class MinecraftDownloadManager:
             # 更新库的独立进度
             self.progress.libraries_progress["current"] = current
             self.progress.libraries_progress["total"] = total
-            self._update_progress(
-                "libraries",
-                current,
-                total,
-                f"正在下载依赖库: {current}/{total}"
-            )
+            # 按步长抽样转发，避免每个文件都更新一次总进度
+            if current == total or current % max(1, total // self.PROGRESS_STEPS) == 0:
+                self._update_progress(
+                    "libraries",
+                    current,
+                    total,
+                    f"正在下载依赖库: {current}/{total}"
+                )
         
         natives_dir = version_info.get_natives_dir()
         success = self.library_downloader.download_libraries(libraries, natives_dir, lib_progress)
@@ -723,7 +879,8 @@ class MinecraftDownloadManager:
             self.progress.assets_progress["total"] = total
             if stage == "index":
                 self._update_progress("assets", current, total, "正在下载资源索引...")
-            else:
+            elif current == total or current % max(1, total // self.PROGRESS_STEPS) == 0:
+                # 按步长抽样转发，避免每个文件都更新一次总进度
                 self._update_progress(
                     "assets",
                     current,
@@ -740,43 +897,264 @@ class MinecraftDownloadManager:
         
         return success
     
+    def _download_fabric_libraries(self, fabric_libraries: list):
+        """
+        下载 Fabric 依赖库（在线程池中与原版下载并行执行）
+        
+        Args:
+            fabric_libraries: Fabric 启动配置中的库列表
+        """
+        total_libs = len(fabric_libraries)
+        self._update_progress("loader_libraries", 0, total_libs, f"正在下载 Fabric 依赖库 (共 {total_libs} 个)...")
+        
+        def fabric_lib_progress(current, total):
+            self._update_progress(
+                "loader_libraries",
+                current,
+                total,
+                f"正在下载 Fabric 依赖库: {current}/{total}"
+            )
+        
+        logger.info(f"Fabric 依赖库数量: {len(fabric_libraries)}")
+        
+        # Fabric的库下载到全局libraries目录（不是版本专属目录）
+        # 所有版本共享libraries
+        success = self.library_downloader.download_libraries(
+            fabric_libraries,
+            None,  # Fabric的库不需要natives解压
+            fabric_lib_progress
+        )
+        
+        if success:
+            self._update_progress("loader_libraries", total_libs, total_libs, "Fabric 依赖库下载完成")
+            logger.info("📦 Fabric 依赖库下载完成")
+        else:
+            logger.warning("部分 Fabric 依赖库下载失败")
+    
+    def _download_fabric_api(self, mc_version: str, fabric_api_version: str, version_mods_dir: Path):
+        """
+        从 Modrinth 下载 Fabric API 到版本专属 mods 目录（在线程池中与原版下载并行执行）
+        
+        Args:
+            mc_version: Minecraft 版本
+            fabric_api_version: Fabric API 版本号
+            version_mods_dir: 版本专属 mods 目录
+        """
+        self._update_progress("fabric_api", 0, 1, "正在下载 Fabric API...")
+        
+        # 版本隔离：mods 目录在版本专属目录下
+        self._ensure_dir(version_mods_dir)
+        logger.info(f"📂 版本专属 mods 目录: {version_mods_dir}")
+        
+        # 从 Modrinth 获取 Fabric API 下载链接
+        try:
+            # Fabric API 的 Modrinth ID
+            fabric_api_id = "P7dR8mSH"
+            url = f"https://api.modrinth.com/v2/project/{fabric_api_id}/version"
+            # 由服务端按 MC 版本和加载器过滤，只返回少量候选版本，
+            # 无需下载并解析完整的版本列表
+            params = {
+                "loaders": '["fabric"]',
+                "game_versions": f'["{mc_version}"]'
+            }
+            
+            # 增加超时时间，并添加重试机制
+            retry_count = 3
+            versions_data = None
+            
+            for attempt in range(retry_count):
+                try:
+                    response = self._http_client.get(url, params=params, timeout=15.0)
+                    if response.status_code == 200:
+                        versions_data = response.json()
+                        break
+                    else:
+                        logger.warning(f"Modrinth API 请求失败: {response.status_code} (重试 {attempt+1}/{retry_count})")
+                        time.sleep(1)
+                except Exception as e:
+                    logger.warning(f"Modrinth API 请求异常: {e} (重试 {attempt+1}/{retry_count})")
+                    time.sleep(1)
+            
+            if versions_data:
+                # 查找匹配的版本（逆序构建，重复版本号时与顺序查找一致取第一个）
+                by_num = {v.get("version_number"): v for v in reversed(versions_data)}
+                target_version = by_num.get(fabric_api_version)
+                
+                if target_version and target_version.get("files"):
+                    # 获取主文件，没有标记 primary 时使用第一个文件
+                    files = target_version["files"]
+                    primary_file = next((f for f in files if f.get("primary")), files[0])
+                    
+                    if primary_file:
+                        download_url = primary_file.get("url")
+                        # 尝试使用镜像
+                        if download_url:
+                            download_url = self.mirror_manager.get_download_url(download_url)
+                            
+                        filename = primary_file.get("filename")
+                        
+                        if download_url and filename:
+                            # 下载 Fabric API jar 到版本专属 mods 目录
+                            fabric_api_path = version_mods_dir / filename
+                            
+                            logger.info(f"下载 Fabric API: {filename}")
+                            
+                            def fabric_api_progress(downloaded, total):
+                                self._update_progress(
+                                    "fabric_api",
+                                    downloaded,
+                                    total,
+                                    f"正在下载 Fabric API: {downloaded / 1024 / 1024:.1f}/{total / 1024 / 1024:.1f} MB"
+                                )
+                            
+                            # 通过 HttpDownloader 下载（自带重试、镜像回退和 SHA1 校验）
+                            download_success = self.downloader.download_file(
+                                url=download_url,
+                                save_path=fabric_api_path,
+                                sha1=primary_file.get("hashes", {}).get("sha1"),
+                                size=primary_file.get("size"),
+                                use_mirror=False,
+                                progress_callback=fabric_api_progress
+                            )
+                            
+                            if download_success:
+                                logger.info(f"✅ Fabric API 已下载到: {fabric_api_path}")
+                                self._update_progress("fabric_api", 1, 1, "Fabric API 下载完成")
+                            else:
+                                logger.error("Fabric API 下载最终失败")
+                        else:
+                            logger.error("Fabric API 文件信息不完整")
+                    else:
+                        logger.error("Fabric API 没有有效的下载文件")
+                else:
+                    logger.error(f"未找到 Fabric API 版本: {fabric_api_version}")
+            else:
+                logger.error("无法获取 Fabric API 版本列表")
+        except Exception as e:
+            logger.error(f"下载 Fabric API 失败: {e}")
+    
+    def _ensure_dir(self, path: Path):
+        """
+        确保目录存在（同一目录只创建一次）
+        
+        Args:
+            path: 目录路径
+        """
+        if path not in self._ensured_dirs:
+            path.mkdir(parents=True, exist_ok=True)
+            self._ensured_dirs.add(path)
+    
+    def _wait_manifest_prefetch(self, timeout: float = 10):
+        """等待后台预取的版本清单（超时后由调用方自行加载）"""
+        if self._manifest_thread is not None:
+            self._manifest_thread.join(timeout=timeout)
+    
+    def set_progress_callback(self, callback: Optional[Callable[[DownloadProgress], None]]):
+        """
+        设置进度回调
+        
+        回调类型（普通函数或协程函数）只在此处判断一次；
+        协程回调在事件循环中注册时，同时记录该循环。
+        
+        Args:
+            callback: 进度回调函数，None 表示不回调
+        """
+        self._callback_is_async = inspect.iscoroutinefunction(callback)
+        if self._callback_is_async:
+            try:
+                self._callback_loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # 不在事件循环中：由 *_async 接口记录调用方的循环
+                pass
+        self.progress_callback = callback
+        
+        if callback and self._progress_thread is None:
+            self._progress_thread = threading.Thread(
+                target=self._progress_emitter,
+                name="ProgressEmitter",
+                daemon=True
+            )
+            self._progress_thread.start()
+    
     def _update_progress(self, stage: str, current: int, total: int, message: str = ""):
         """更新进度"""
         self.progress.update(stage, current, total, message)
         
         if self.progress_callback:
-            try:
-                # 检查是否是异步回调
-                import inspect
-                import asyncio
-                if inspect.iscoroutinefunction(self.progress_callback):
-                    # 如果在事件循环中，使用 create_task
-                    try:
-                        loop = asyncio.get_running_loop()
-                        if loop.is_running():
-                            loop.create_task(self.progress_callback(self.progress))
-                    except RuntimeError:
-                        # 如果没有事件循环，创建一个新的（不太可能在下载器中发生，除非是在独立脚本）
-                        pass
-                else:
-                    # 如果不是协程函数，直接调用
-                    # 但如果外部期望是异步环境（例如在异步任务中调用同步回调），这可能会阻塞
-                    # 如果回调本身需要进行异步操作（如 manager.broadcast），它应该被定义为 async
-                    
-                    # 这里尝试检查是否需要将同步回调放入线程池，或者直接调用
-                    self.progress_callback(self.progress)
-            except Exception as e:
-                logger.error(f"进度回调异常: {e}")
+            # 交给发送线程合并发送
+            self._progress_event.set()
+        
+        # 同时输出日志（INFO 被过滤时直接返回，不做任何计算）
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        
+        # 限流：阶段开始/结束总是输出，中间进度按时间或步长抽样
+        if 0 < current < total:
+            now = time.monotonic()
+            last_time, last_current = self._last_progress_log.get(stage, (0.0, -1))
+            if (now - last_time < self.PROGRESS_LOG_INTERVAL
+                    and current - last_current < max(1, total // self.PROGRESS_STEPS)):
+                return
+            self._last_progress_log[stage] = (now, current)
         
-        # 同时输出日志
         if total > 0:
-            percentage = (current / total) * 100
-            logger.info(f"[{stage}] {percentage:.1f}% - {message}")
+            logger.info("[%s] %.1f%% - %s", stage, current * 100.0 / total, message)
         else:
-            logger.info(f"[{stage}] {message}")
+            logger.info("[%s] %s", stage, message)
+    
+    def _progress_emitter(self):
+        """进度发送线程：等待进度变化，按最小间隔调用回调"""
+        while True:
+            self._progress_event.wait()
+            self._progress_event.clear()
+            self._emit_progress()
+            
+            # 关闭后若无新的进度则退出（有则再发送一次，保证最终状态送达）
+            if self._closed and not self._progress_event.is_set():
+                break
+            time.sleep(self.PROGRESS_INTERVAL)
+    
+    def _emit_progress(self):
+        """以当前进度调用进度回调"""
+        try:
+            if self._callback_is_async:
+                # 上一次协程回调尚未完成：稍后再发送（届时取最新进度），
+                # 避免事件循环繁忙时堆积大量观察同一进度对象的协程；关闭时总是发送最终进度
+                if (not self._closed and self._callback_future is not None
+                        and not self._callback_future.done()):
+                    self._progress_event.set()
+                    return
+                
+                # 投递到异步调用方的事件循环
+                if self._callback_loop is not None and not self._callback_loop.is_closed():
+                    self._callback_future = asyncio.run_coroutine_threadsafe(
+                        self.progress_callback(self.progress),
+                        self._callback_loop
+                    )
+            else:
+                self.progress_callback(self.progress)
+        except Exception as e:
+            logger.error(f"进度回调异常: {e}")
     
     def close(self):
-        """关闭下载器"""
+        """
+        关闭下载器，释放线程池和连接
+        
+        可重复调用。共享的 httpx 会话（_http_client）属于全局连接池，不在此关闭。
+        """
+        if self._closed:
+            return
+        self._closed = True
+        
+        # 先等线程池中仍在运行的任务结束，它们的进度和校验记录才不会丢失
+        self._io_pool.shutdown(wait=True, cancel_futures=True)
+        
+        # 唤醒发送线程，发送最后一次进度后退出
+        if self._progress_thread is not None:
+            self._progress_event.set()
+            self._progress_thread.join()
+        
+        self.verified_cache.save()
         self.downloader.close()
     
     def _detect_loader_type(self, version_data: dict, version_id: str) -> str:
@@ -791,62 +1169,40 @@ class MinecraftDownloadManager:
             加载器类型: fabric, forge, neoforge, optifine, release, snapshot
         """
         # 1. 检查 mainClass 字段
-        main_class = version_data.get("mainClass", "").lower()
-        
-        if "fabric" in main_class or "net.fabricmc" in main_class:
-            return "fabric"
-        if "neoforge" in main_class or "net.neoforged" in main_class:
-            return "neoforge"
-        if "forge" in main_class or "net.minecraftforge" in main_class:
-            return "forge"
-        if "optifine" in main_class:
-            return "optifine"
-        
-        # 2. 检查 libraries 字段
+        loader = _match_loader(version_data.get("mainClass", "").lower(), _LOADER_KEYWORDS)
+        if loader:
+            return loader
+        
+        # 2. 检查 libraries 字段（库名拼接后只转换一次小写，换行分隔保证关键字不会跨库匹配）
         libraries = version_data.get("libraries", [])
-        for lib in libraries:
-            lib_name = lib.get("name", "").lower()
-            if "net.fabricmc" in lib_name or "fabric-loader" in lib_name:
-                return "fabric"
-            if "net.neoforged" in lib_name or "neoforge" in lib_name:
-                return "neoforge"
-            if "net.minecraftforge" in lib_name or "forge" in lib_name:
-                # 需要再次检查不是 neoforge
-                if "neoforge" not in lib_name:
-                    return "forge"
-            if "optifine" in lib_name:
-                return "optifine"
+        if libraries:
+            lib_names = "\n".join(lib.get("name", "") for lib in libraries).lower()
+            loader = _match_loader(lib_names, _LIBRARY_LOADER_KEYWORDS)
+            if loader:
+                return loader
         
         # 3. 检查版本 ID
-        version_id_lower = version_id.lower()
-        if "fabric" in version_id_lower:
-            return "fabric"
-        if "neoforge" in version_id_lower:
-            return "neoforge"
-        if "forge" in version_id_lower:
-            return "forge"
-        if "optifine" in version_id_lower:
-            return "optifine"
+        loader = _match_loader(version_id.lower(), _LOADER_KEYWORDS)
+        if loader:
+            return loader
         
         # 4. 检查 inheritsFrom 字段（有些版本会有这个）
-        inherits_from = version_data.get("inheritsFrom", "")
-        if inherits_from:
+        if version_data.get("inheritsFrom"):
             # 如果有继承，说明可能是加载器版本，再检查 arguments 或 minecraftArguments
             arguments = version_data.get("arguments", {})
-            game_args = arguments.get("game", []) if isinstance(arguments, dict) else []
-            jvm_args = arguments.get("jvm", []) if isinstance(arguments, dict) else []
+            if isinstance(arguments, dict):
+                loader = (_match_loader_in_args(arguments.get("game", []))
+                          or _match_loader_in_args(arguments.get("jvm", [])))
+                if loader:
+                    return loader
             
-            all_args = str(game_args) + str(jvm_args)
-            if "fabric" in all_args.lower():
-                return "fabric"
-            if "neoforge" in all_args.lower():
-                return "neoforge"
-            if "forge" in all_args.lower():
-                return "forge"
+            loader = _match_loader(version_data.get("minecraftArguments", "").lower(), _LOADER_KEYWORDS)
+            if loader:
+                return loader
         
         # 5. 默认返回官方类型
         official_type = version_data.get("type", "release")
-        if official_type in ["snapshot", "old_beta", "old_alpha"]:
+        if official_type in _NON_RELEASE_TYPES:
             return official_type
         
         return "release"
@@ -858,131 +1214,176 @@ class MinecraftDownloadManager:
         Returns:
             已安装版本列表，每个版本包含 id 和类型信息
         """
-        installed_versions = []
-        
-        # 检查 versions 目录
+        # 遍历 versions 目录（scandir 的目录项自带文件类型，判断目录无需额外 stat）
         versions_dir = self.minecraft_dir / "versions"
-        if not versions_dir.exists():
-            return installed_versions
-        
-        # 遍历版本目录
-        for version_dir in versions_dir.iterdir():
-            if version_dir.is_dir():
-                version_id = version_dir.name
-                
-                # 查找目录中的JSON和JAR文件
-                json_files = list(version_dir.glob("*.json"))
-                jar_files = list(version_dir.glob("*.jar"))
-                
-                # 必须同时存在JSON和JAR才算有效版本
-                if json_files and jar_files:
-                    version_json = json_files[0]
-                    version_jar = jar_files[0]
-                    # 读取版本信息
-                    try:
-                        with open(version_json, "r", encoding="utf-8") as f:
-                            version_data = json.load(f)
-                        
-                        # 确保 version_data 是字典
-                        if not isinstance(version_data, dict):
-                             # 如果是列表（可能是PCL等启动器的列表缓存），尝试找到真正的版本对象
-                            if isinstance(version_data, list):
-                                logger.warning(f"版本 {version_id} JSON 格式异常（列表），尝试修复")
-                                # 简单的策略：如果列表里有字典且包含 id 字段，且 id 匹配，则使用它
-                                found = False
-                                for item in version_data:
-                                    if isinstance(item, dict) and item.get("id") == version_id:
-                                        version_data = item
-                                        found = True
-                                        break
-                                if not found:
-                                    # 如果没找到匹配的，但列表第一个是字典，尝试使用
-                                    if version_data and isinstance(version_data[0], dict):
-                                        version_data = version_data[0]
-                                    else:
-                                        raise ValueError("Version JSON is a list but contains no valid version object")
+        try:
+            with os.scandir(versions_dir) as entries:
+                version_dirs = [Path(entry.path) for entry in entries if entry.is_dir()]
+        except FileNotFoundError:
+            return []
+        
+        # 并行读取各版本 JSON，重叠磁盘 IO（结果保持目录顺序）
+        if len(version_dirs) > 1:
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(32, len(version_dirs)),
+                thread_name_prefix="mc-versions"
+            ) as executor:
+                results = list(executor.map(self._load_version_entry, version_dirs))
+        else:
+            results = [self._load_version_entry(version_dir) for version_dir in version_dirs]
+        
+        return [info for info in results if info is not None]
+    
+    def _load_version_entry(self, version_dir: Path) -> Optional[Dict[str, Any]]:
+        """
+        读取单个版本目录的信息（可在线程池中并行执行）
+        
+        Args:
+            version_dir: 版本目录
+            
+        Returns:
+            版本信息，目录中缺少 JSON 或 JAR 时返回 None
+        """
+        version_id = version_dir.name
+        
+        # 一次 scandir 查找目录中的JSON和JAR文件（替代两次 glob）
+        version_json = None
+        version_jar = None
+        json_entry = None
+        try:
+            with os.scandir(version_dir) as entries:
+                for entry in entries:
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    name = entry.name
+                    if version_json is None and name.endswith(".json"):
+                        version_json = Path(entry.path)
+                        json_entry = entry
+                    elif version_jar is None and name.endswith(".jar"):
+                        version_jar = Path(entry.path)
+                    if version_json and version_jar:
+                        break
+        except OSError as e:
+            logger.warning(f"读取版本目录 {version_id} 失败: {e}")
+            return None
+        
+        # 必须同时存在JSON和JAR才算有效版本
+        if version_json and version_jar:
+            # 安装器生成的标准版本名已能确定加载器类型，无需读取 JSON
+            canonical = _CANONICAL_LOADER_ID_RE.fullmatch(version_id)
+            if canonical:
+                return {
+                    "id": version_id,
+                    "type": canonical.lastgroup,
+                    "installed": True,
+                    "jar_exists": True,
+                    "json_exists": True
+                }
+            
+            # 版本 JSON 未变化（修改时间和大小相同）时直接复用上次的检测结果
+            cache_path = os.fspath(version_json)
+            try:
+                st = json_entry.stat()
+                cache_key = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                cache_key = None
+            cached = self._version_entry_cache.get(cache_path)
+            if cache_key is not None and cached is not None and cached[0] == cache_key:
+                return dict(cached[1])
+            
+            # 读取版本信息
+            try:
+                version_data = json_loads(version_json.read_bytes())
+                
+                # 确保 version_data 是字典
+                if not isinstance(version_data, dict):
+                     # 如果是列表（可能是PCL等启动器的列表缓存），尝试找到真正的版本对象
+                    if isinstance(version_data, list):
+                        logger.warning(f"版本 {version_id} JSON 格式异常（列表），尝试修复")
+                        # 简单的策略：如果列表里有字典且包含 id 字段，且 id 匹配，则使用它
+                        found = False
+                        for item in version_data:
+                            if isinstance(item, dict) and item.get("id") == version_id:
+                                version_data = item
+                                found = True
+                                break
+                        if not found:
+                            # 如果没找到匹配的，但列表第一个是字典，尝试使用
+                            if version_data and isinstance(version_data[0], dict):
+                                version_data = version_data[0]
                             else:
-                                raise ValueError(f"Version JSON format error: expected dict, got {type(version_data)}")
+                                raise ValueError("Version JSON is a list but contains no valid version object")
+                    else:
+                        raise ValueError(f"Version JSON format error: expected dict, got {type(version_data)}")
 
-                        # 检测加载器类型
-                        loader_type = self._detect_loader_type(version_data, version_id)
-                        
-                        version_info = {
-                            "id": version_id,
-                            "type": loader_type,
-                            "installed": True,
-                            "jar_exists": version_jar.exists(),
-                            "json_exists": version_json.exists()
-                        }
-                        
-                        installed_versions.append(version_info)
-                    except Exception as e:
-                        logger.warning(f"读取版本 {version_id} 信息失败: {e}")
-                        # 即使读取失败，也添加基本版本信息
-                        # 尝试从版本名推断类型
-                        version_type = "release"
-                        version_id_lower = version_id.lower()
-                        if "fabric" in version_id_lower:
-                            version_type = "fabric"
-                        elif "neoforge" in version_id_lower:
-                            version_type = "neoforge"
-                        elif "forge" in version_id_lower:
-                            version_type = "forge"
-                        elif "optifine" in version_id_lower:
-                            version_type = "optifine"
-                        elif "snapshot" in version_id_lower or "w" in version_id_lower:
-                            version_type = "snapshot"
-                        elif "pre" in version_id_lower or "rc" in version_id_lower:
-                            version_type = "snapshot"
-                        
-                        installed_versions.append({
-                            "id": version_id,
-                            "type": version_type,
-                            "installed": True,
-                            "jar_exists": version_jar.exists(),
-                            "json_exists": version_json.exists()
-                        })
+                # 检测加载器类型
+                loader_type = self._detect_loader_type(version_data, version_id)
+                
+                version_info = {
+                    "id": version_id,
+                    "type": loader_type,
+                    "installed": True,
+                    "jar_exists": True,
+                    "json_exists": True
+                }
+                
+                if cache_key is not None:
+                    self._version_entry_cache[cache_path] = (cache_key, version_info)
+                return dict(version_info)
+            except Exception as e:
+                logger.warning(f"读取版本 {version_id} 信息失败: {e}")
+                # 即使读取失败，也添加基本版本信息
+                # 尝试从版本名推断类型
+                return {
+                    "id": version_id,
+                    "type": _guess_type_from_id(version_id),
+                    "installed": True,
+                    "jar_exists": True,
+                    "json_exists": True
+                }
         
-        return installed_versions
+        return None
     
     def _find_java_path(self) -> str:
         """
-        查找 Java 可执行文件路径
+        查找 Java 可执行文件路径（找到后缓存在实例上，未找到时每次重新查找）
         
         Returns:
             Java 可执行文件路径
         """
-        import subprocess
-        import platform
+        if self._java_path is None:
+            self._java_path = self._locate_java()
+        return self._java_path or "java"
+    
+    @staticmethod
+    def _locate_java() -> Optional[str]:
+        """
+        在 PATH 和常见安装目录中查找 Java
         
-        # 首先检查系统 PATH 中的 java
-        try:
-            result = subprocess.run(["java", "-version"], 
-                                  capture_output=True, text=True, timeout=10)
-            if result.returncode == 0:
-                return "java"
-        except (subprocess.TimeoutExpired, FileNotFoundError):
-            pass
-        
-        # Windows 系统尝试常见路径
+        Returns:
+            Java 可执行文件路径，未找到返回 None
+        """
+        # 首先检查系统 PATH 中的 java（只查找文件，不启动 JVM）
+        if shutil.which("java"):
+            return "java"
+        
+        # Windows 系统尝试常见路径：每个安装目录只读取一次，按候选顺序匹配
         if platform.system() == "Windows":
-            common_paths = [
-                "C:\\Program Files\\Java\\jdk-17\\bin\\java.exe",
-                "C:\\Program Files\\Java\\jre-17\\bin\\java.exe",
-                "C:\\Program Files\\Eclipse Adoptium\\jdk-17\\bin\\java.exe",
-                "C:\\Program Files\\Eclipse Adoptium\\jre-17\\bin\\java.exe",
-                "C:\\Program Files (x86)\\Java\\jdk-17\\bin\\java.exe",
-                "C:\\Program Files (x86)\\Java\\jre-17\\bin\\java.exe",
-                "C:\\Program Files\\Java\\jdk-21\\bin\\java.exe",
-                "C:\\Program Files\\Eclipse Adoptium\\jdk-21\\bin\\java.exe",
-            ]
-            
-            for path in common_paths:
-                if Path(path).exists():
-                    return path
-        
-        # 默认返回 java
-        return "java"
+            dir_entries: Dict[str, Set[str]] = {}
+            for parent, name in _WINDOWS_JAVA_CANDIDATES:
+                if parent not in dir_entries:
+                    try:
+                        with os.scandir(parent) as entries:
+                            dir_entries[parent] = {entry.name for entry in entries}
+                    except OSError:
+                        dir_entries[parent] = set()
+                
+                if name in dir_entries[parent]:
+                    java_path = os.path.join(parent, name, "bin", "java.exe")
+                    if os.path.isfile(java_path):
+                        return java_path
+        
+        return None
     
     def __enter__(self):
         return self
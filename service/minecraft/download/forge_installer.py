@@ -5,16 +5,17 @@ Forge/NeoForge 安装器处理器
 - NeoForge (1.20.1+) 安装
 参考 HMCL/PCL2 实现
 """
-import json
 import zipfile
 import subprocess
 import tempfile
 import shutil
 import re
+from concurrent.futures import Executor, wait
 from pathlib import Path
 from typing import Optional, Dict, Any, List, Callable
 from utils.logger import logger
 from .http_downloader import HttpDownloader, DownloadTask
+from .json_utils import json_loads, json_dumps, atomic_write_bytes
 
 
 class ForgeInstaller:
@@ -28,7 +29,8 @@ class ForgeInstaller:
         self, 
         minecraft_dir: Path, 
         downloader: HttpDownloader,
-        progress_callback: Optional[Callable[[str, int, int], None]] = None
+        progress_callback: Optional[Callable[[str, int, int], None]] = None,
+        executor: Optional[Executor] = None
     ):
         """
         初始化 Forge 安装器
@@ -37,10 +39,12 @@ class ForgeInstaller:
             minecraft_dir: Minecraft 根目录
             downloader: HTTP 下载器
             progress_callback: 进度回调 (stage, current, total)
+            executor: 后台线程池，提供时运行时库下载与 processors 并行执行
         """
         self.minecraft_dir = Path(minecraft_dir)
         self.downloader = downloader
         self.progress_callback = progress_callback
+        self.executor = executor
         self.libraries_dir = self.minecraft_dir / "libraries"
         self.libraries_dir.mkdir(parents=True, exist_ok=True)
     
@@ -200,37 +204,55 @@ class ForgeInstaller:
                 # 2. 下载缺失的 Forge libraries（提取后再下载，避免重复下载已提取的文件）
                 self._update_progress("forge_libraries", 0, 1)
                 
-                # 合并所有需要下载的库
-                all_libraries = []
-                
-                # version.json 中的库
+                # version.json 中的库（仅游戏运行时需要）
                 version_libs = version_json.get("libraries", [])
-                all_libraries.extend(version_libs)
                 
                 # install_profile 中的库 (用于执行 processors)
                 installer_libs = install_profile.get("libraries", [])
-                all_libraries.extend(installer_libs)
                 
                 logger.info(f"📦 需要检查的库: version={len(version_libs)}, installer={len(installer_libs)}")
                 
-                # 下载缺失的库（已存在的会自动跳过）
-                if not self._download_forge_libraries(all_libraries):
-                    logger.error("Forge 库下载失败")
-                    return False
+                # processors 只依赖 installer 库；运行时库（去除重复项）在后台下载，与 processors 并行
+                installer_lib_names = {lib.get("name") for lib in installer_libs}
+                runtime_libs = [lib for lib in version_libs if lib.get("name") not in installer_lib_names]
                 
-                # 3. 执行 processors
-                processors = install_profile.get("processors", [])
-                if processors:
-                    self._update_progress("processors", 0, len(processors))
+                runtime_future = None
+                try:
+                    if self.executor is not None:
+                        runtime_future = self.executor.submit(self._download_forge_libraries, runtime_libs)
+                        download_libs = installer_libs
+                    else:
+                        download_libs = runtime_libs + installer_libs
+                    
+                    # 下载缺失的库（已存在的会自动跳过）
+                    if not self._download_forge_libraries(download_libs):
+                        logger.error("Forge 库下载失败")
+                        return False
                     
-                    data = install_profile.get("data", {})
+                    # 3. 执行 processors
+                    processors = install_profile.get("processors", [])
+                    if processors:
+                        self._update_progress("processors", 0, len(processors))
+                        
+                        data = install_profile.get("data", {})
+                        
+                        if not self._execute_processors(
+                            processors, data, mc_version, forge_version,
+                            temp_dir, java_path, custom_name
+                        ):
+                            logger.error("Forge processors 执行失败")
+                            return False
                     
-                    if not self._execute_processors(
-                        processors, data, mc_version, forge_version,
-                        temp_dir, java_path, custom_name
-                    ):
-                        logger.error("Forge processors 执行失败")
+                    # 等待后台运行时库下载完成
+                    if runtime_future is not None and not runtime_future.result():
+                        logger.error("Forge 库下载失败")
                         return False
+                finally:
+                    # 失败返回或异常时取消后台运行时库下载，并等待已开始的任务结束，
+                    # 避免安装失败后仍占用共享线程池（关闭管理器时会等待它）
+                    if runtime_future is not None and not runtime_future.done():
+                        runtime_future.cancel()
+                        wait([runtime_future])
             
             # 4. 生成版本 JSON
             self._update_progress("generate_json", 0, 1)
@@ -339,6 +361,8 @@ class ForgeInstaller:
         """
         download_tasks = []
         skipped_count = 0
+        # 同一文件在库列表中可能出现多次，只处理一次（避免重复请求及并发写同一临时文件）
+        seen_paths = set()
         
         for lib in libraries:
             name = lib.get("name")
@@ -347,8 +371,9 @@ class ForgeInstaller:
             
             # 解析库路径
             lib_path = self._maven_name_to_path(name)
-            if not lib_path:
+            if not lib_path or lib_path in seen_paths:
                 continue
+            seen_paths.add(lib_path)
             
             save_path = self.libraries_dir / lib_path
             
@@ -654,8 +679,7 @@ class ForgeInstaller:
                 logger.error(f"MC 原版 JSON 不存在: {mc_json_path}")
                 return False
             
-            with open(mc_json_path, "r", encoding="utf-8") as f:
-                mc_data = json.load(f)
+            mc_data = json_loads(mc_json_path.read_bytes())
             
             # 合并配置（完全合并模式，不使用 inheritsFrom）
             merged_data = version_json.copy()
@@ -726,8 +750,7 @@ class ForgeInstaller:
             
             # 保存 JSON
             json_path = version_dir / f"{final_name}.json"
-            with open(json_path, "w", encoding="utf-8") as f:
-                json.dump(merged_data, f, ensure_ascii=False, indent=2)
+            atomic_write_bytes(json_path, json_dumps(merged_data, indent=False))
             
             logger.info(f"✅ 已生成版本 JSON: {json_path.name}")
             logger.info(f"   mainClass: {merged_data.get('mainClass')}")
@@ -3,15 +3,95 @@
 使用连接池复用，支持断点续传和重试机制
 """
 import httpx
+import contextlib
 import hashlib
+import mmap
+import os
+import threading
+import time
 from pathlib import Path
-from typing import Optional, Callable, Dict, Any
-from concurrent.futures import ThreadPoolExecutor, Future
+from urllib.parse import urlsplit
+from typing import Optional, Callable, Dict, Any, Iterable, Tuple
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
 from utils.logger import logger
+from utils.httpx import get_session
 from .mirror_utils import MirrorManager, MirrorSource
+from .verified_cache import VerifiedCache
 from config import Config
 
 
+# 超过该大小的文件在写入前预分配磁盘空间（如客户端 JAR）
+PREALLOCATE_THRESHOLD = 1024 * 1024
+
+# 已知大小超过该值的文件按 Range 分段并发下载（镜像节点常对单连接限速）
+RANGED_DOWNLOAD_THRESHOLD = 8 * 1024 * 1024
+RANGED_DOWNLOAD_PARTS = 4
+
+# 流式下载每次交给 Python 处理的块大小：块越大，写入/哈希/进度回调的调用次数越少
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+
+# 批量下载时单个主机的最大并发数（未列出的主机只受线程池大小限制）
+# 公益镜像和 Maven 仓库并发过高容易触发 429 限流或连接被拒
+HOST_CONCURRENCY_LIMITS = {
+    "bmclapi2.bangbang93.com": 32,
+    "maven.fabricmc.net": 8,
+    "maven.minecraftforge.net": 8,
+    "maven.neoforged.net": 8,
+}
+
+
+# 总大小未知时，进度回调按该字节数为一档
+PROGRESS_UNKNOWN_STEP = 1024 * 1024
+
+
+def throttle_progress(callback: Callable[[int, int], None]) -> Callable[[int, int], None]:
+    """
+    包装字节级进度回调：只在整数百分比变化时转发（总大小未知时每 1 MiB 转发一次），
+    单个文件最多约 100 次回调，不再每个数据块都触发界面信号和日志格式化
+    
+    Args:
+        callback: 原进度回调 (current, total)
+        
+    Returns:
+        限频后的进度回调
+    """
+    last_step = None
+    
+    def throttled(current: int, total: int):
+        nonlocal last_step
+        step = current * 100 // total if total > 0 else current // PROGRESS_UNKNOWN_STEP
+        if step == last_step and current != total:
+            return
+        last_step = step
+        callback(current, total)
+    
+    return throttled
+
+
+def file_sha1(file_path: Path) -> str:
+    """
+    计算文件 SHA1（十六进制小写）
+    
+    Python 3.11+ 使用 hashlib.file_digest（OpenSSL 后端，可使用 SHA-NI，大块读取），
+    旧版本回退到 mmap 整体映射后一次性计算，避免逐块读取的 Python 循环。
+    
+    Args:
+        file_path: 文件路径
+        
+    Returns:
+        SHA1 十六进制字符串
+    """
+    with open(file_path, "rb") as f:
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha1").hexdigest()
+        
+        # 空文件无法 mmap
+        if f.seek(0, 2) == 0:
+            return hashlib.sha1().hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return hashlib.sha1(mm).hexdigest()
+
+
 def verify_file_integrity(file_path: Path, sha1: Optional[str] = None, size: Optional[int] = None) -> bool:
     """
     校验文件完整性（独立函数）
@@ -24,20 +104,19 @@ def verify_file_integrity(file_path: Path, sha1: Optional[str] = None, size: Opt
     Returns:
         校验是否通过
     """
-    if not file_path.exists():
+    # 一次 stat 同时完成存在性和大小检查（替代 exists() + stat() 两次系统调用）
+    try:
+        st = os.stat(file_path)
+    except OSError:
         return False
-        
+    
     if size is not None and size > 0:
-        if file_path.stat().st_size != size:
+        if st.st_size != size:
             return False
             
     if sha1:
         try:
-            hasher = hashlib.sha1()
-            with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(8192), b""):
-                    hasher.update(chunk)
-            return hasher.hexdigest().lower() == sha1.lower()
+            return file_sha1(file_path) == sha1.lower()
         except Exception as e:
             logger.warning(f"校验文件异常: {e}")
             return False
@@ -53,12 +132,16 @@ class DownloadTask:
         url: str,
         save_path: Path,
         sha1: Optional[str] = None,
-        description: Optional[str] = None
+        description: Optional[str] = None,
+        mirror_key: Optional[str] = None,
+        size: Optional[int] = None
     ):
         self.url = url
         self.save_path = save_path
         self.sha1 = sha1
+        self.size = size  # 已知文件大小：大小不符的旧文件无需计算哈希即可判定损坏
         self.description = description or url
+        self.mirror_key = mirror_key  # 同 key 的任务固定使用同一镜像源
         self.downloaded_bytes = 0
         self.total_bytes = 0
         self.status = "pending"  # pending, downloading, completed, failed
@@ -73,7 +156,8 @@ class HttpDownloader:
         max_connections: int = 50,
         timeout: int = 30,
         max_retries: int = 3,
-        mirror_manager: Optional[MirrorManager] = None
+        mirror_manager: Optional[MirrorManager] = None,
+        verified_cache: Optional[VerifiedCache] = None
     ):
         """
         初始化下载器
@@ -83,35 +167,78 @@ class HttpDownloader:
             timeout: 请求超时时间（秒）
             max_retries: 最大重试次数
             mirror_manager: 镜像管理器
+            verified_cache: 已校验文件缓存（命中时跳过 SHA1 计算）
         """
         self.max_connections = max_connections
         self.timeout = timeout
         self.max_retries = max_retries
         self.mirror_manager = mirror_manager or MirrorManager()
+        self.verified_cache = verified_cache
+        
+        # 文件下载客户端在首次下载时才创建（创建 SSL 上下文较耗时，
+        # 而按请求创建的管理器多数只做元数据查询，根本用不到它）
+        self._client: Optional[httpx.Client] = None
+        self._client_lock = threading.Lock()
         
-        # 创建 httpx 客户端（启用 HTTP/2 和连接池）
-        self.client = httpx.Client(
-            http2=True,
-            timeout=httpx.Timeout(timeout),
-            limits=httpx.Limits(
-                max_connections=max_connections,
-                max_keepalive_connections=20
-            ),
-            follow_redirects=True,
-            headers={
-                "User-Agent": f"{Config.APP_NAME}/{Config.APP_VERSION}"
-            }
-        )
+        # 元数据请求（版本清单、版本 JSON 等小请求）使用进程级共享的 HTTP/2 客户端，
+        # 下载管理器按请求创建时也能复用已建立的 TLS 连接；文件下载仍使用上面的独立连接池
+        self.meta_client = get_session()
+        self._meta_headers = {"User-Agent": f"{Config.APP_NAME}/{Config.APP_VERSION}"}
         
         # 线程池用于并发下载
         self.executor = ThreadPoolExecutor(max_workers=max_connections)
         
+        # 镜像固定表（mirror_key → 最近成功的镜像源），复用同一主机的连接
+        self._mirror_pins: Dict[str, MirrorSource] = {}
+        
+        # 按主机限制并发（主机 → 信号量），见 HOST_CONCURRENCY_LIMITS
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_slots_lock = threading.Lock()
+        # 当前线程（批量下载任务）已持有的主机名额
+        self._held_slot = threading.local()
+        
+        # 已确认存在的目录（如资源 objects 下 256 个哈希前缀目录），同目录文件不再重复 mkdir
+        self._ready_dirs: set = set()
+        
         # 下载统计
         self.total_downloaded = 0
         self.total_failed = 0
         self.total_skipped = 0  # 跳过的文件数
     
 
+    @property
+    def client(self) -> httpx.Client:
+        """文件下载使用的 httpx 客户端（启用 HTTP/2 和连接池，首次访问时创建）"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = httpx.Client(
+                        http2=True,
+                        timeout=httpx.Timeout(self.timeout),
+                        limits=httpx.Limits(
+                            max_connections=self.max_connections,
+                            # 保活连接数与并发数一致，避免回退到 HTTP/1.1 的主机在批量下载时反复握手
+                            max_keepalive_connections=self.max_connections
+                        ),
+                        follow_redirects=True,
+                        headers={
+                            "User-Agent": f"{Config.APP_NAME}/{Config.APP_VERSION}"
+                        }
+                    )
+        return self._client
+    
+    def ensure_dir(self, directory: Path):
+        """
+        确保目录存在（每个目录只创建一次，之后直接命中内存记录）
+        
+        Args:
+            directory: 目录路径
+        """
+        if directory in self._ready_dirs:
+            return
+        directory.mkdir(parents=True, exist_ok=True)
+        self._ready_dirs.add(directory)
+    
     def verify_file(self, file_path: Path, sha1: Optional[str] = None, size: Optional[int] = None) -> bool:
         """校验文件完整性（代理到全局函数）"""
         return verify_file_integrity(file_path, sha1, size)
@@ -123,7 +250,8 @@ class HttpDownloader:
         sha1: Optional[str] = None,
         size: Optional[int] = None,
         use_mirror: bool = True,
-        progress_callback: Optional[Callable[[int, int], None]] = None
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        mirror_key: Optional[str] = None
     ) -> bool:
         """
         下载单个文件，支持自动重试和镜像切换
@@ -135,6 +263,7 @@ class HttpDownloader:
             size: 文件大小（可选，用于进度显示）
             use_mirror: 是否使用镜像加速
             progress_callback: 进度回调
+            mirror_key: 镜像固定键（如资源哈希前缀），同键文件沿用上次成功的镜像源
             
         Returns:
             是否下载成功
@@ -144,26 +273,35 @@ class HttpDownloader:
             return False
             
         # 1. 检查文件是否已存在且完整
+        # 先查已校验缓存（仅需一次 stat），未命中再读取文件计算哈希
+        if sha1 and self.verified_cache and self.verified_cache.is_verified(save_path, sha1):
+            if progress_callback and size:
+                progress_callback(size, size)
+            return True
+        
         # 使用全局函数进行校验，避免 self.verify_file 可能的属性丢失问题
         if verify_file_integrity(save_path, sha1, size):
+            if sha1 and self.verified_cache:
+                self.verified_cache.add(save_path, sha1)
             if progress_callback and size:
                 progress_callback(size, size)
             return True
             
         # 2. 准备下载
-        save_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ensure_dir(save_path.parent)
+        if progress_callback:
+            progress_callback = throttle_progress(progress_callback)
         temp_path = save_path.with_suffix(save_path.suffix + ".part")
         
         # 3. 获取下载 URL（镜像）
         download_url = url
         if use_mirror and self.mirror_manager:
-            download_url = self.mirror_manager.get_download_url(url)
+            pinned_source = self._mirror_pins.get(mirror_key) if mirror_key else None
+            download_url = self.mirror_manager.get_download_url(url, pinned_source)
         # 检测实际使用的镜像源（基于最终 URL）
-        actual_source = (
-            MirrorSource.BMCLAPI if "bmclapi2.bangbang93.com" in download_url or "bmclapi.bangbang93.com" in download_url else
-            MirrorSource.OFFICIAL
-        )
-        logger.info(f"下载源: {actual_source.name}, URL: {download_url}")
+        actual_source = self._detect_source(download_url)
+        # 每个文件都会经过这里，批量下载时降为 debug，并用 % 参数让被过滤的记录跳过格式化
+        logger.debug("下载源: %s, URL: %s", actual_source.name, download_url)
             
         # 4. 执行下载（带重试）
         max_retries = 5
@@ -171,53 +309,98 @@ class HttpDownloader:
         
         while retry_count < max_retries:
             try:
-                import time
                 # 线性退避
                 if retry_count > 0:
                     wait_time = 2 * retry_count
                     time.sleep(wait_time)
                 
-                # 使用流式下载
-                with self.client.stream("GET", download_url, follow_redirects=True, timeout=60.0) as response:
-                    if response.status_code != 200:
-                        # 如果是 404，且当前为 BMCLAPI，尝试对象/包路径互换
-                        if response.status_code == 404 and actual_source == MirrorSource.BMCLAPI and use_mirror:
-                            alt_url = None
-                            if "/v1/packages/" in download_url:
-                                alt_url = download_url.replace("/v1/packages/", "/v1/objects/")
-                            elif "/v1/objects/" in download_url:
-                                alt_url = download_url.replace("/v1/objects/", "/v1/packages/")
-                            if alt_url and alt_url != download_url:
-                                logger.info(f"尝试备用路径: {alt_url}")
-                                download_url = alt_url
-                                continue
+                # 已知大小的大文件首次尝试分段并发下载，服务器不支持 Range 时回退到单连接流式下载
+                ranged = (
+                    retry_count == 0
+                    and size is not None
+                    and size >= RANGED_DOWNLOAD_THRESHOLD
+                    and self._download_ranged(download_url, temp_path, size, progress_callback)
+                )
+                hasher = None
+                
+                if not ranged:
+                    # 使用流式下载
+                    with self.client.stream("GET", download_url, follow_redirects=True, timeout=60.0) as response:
+                        if response.status_code != 200:
+                            # 如果是 404，且当前为 BMCLAPI，尝试对象/包路径互换
+                            if response.status_code == 404 and actual_source == MirrorSource.BMCLAPI and use_mirror:
+                                alt_url = None
+                                if "/v1/packages/" in download_url:
+                                    alt_url = download_url.replace("/v1/packages/", "/v1/objects/")
+                                elif "/v1/objects/" in download_url:
+                                    alt_url = download_url.replace("/v1/objects/", "/v1/packages/")
+                                if alt_url and alt_url != download_url:
+                                    logger.info(f"尝试备用路径: {alt_url}")
+                                    download_url = alt_url
+                                    continue
 
-                        # 其他错误或继续失败：切换镜像源
-                        if self.mirror_manager and use_mirror:
-                            logger.warning(f"下载失败 {response.status_code}，尝试切换镜像源...")
-                            if self.mirror_manager.switch_to_fallback():
-                                download_url = self.mirror_manager.get_download_url(url)
-                                logger.info(f"已切换到: {self.mirror_manager.current_source.name}, URL: {download_url}")
+                            # 固定了镜像的任务：仅对该 key 改用官方源重新探测，不影响全局镜像
+                            if mirror_key and use_mirror and actual_source == MirrorSource.BMCLAPI:
+                                self._mirror_pins[mirror_key] = MirrorSource.OFFICIAL
+                                download_url = url
+                                actual_source = MirrorSource.OFFICIAL
+                                logger.info(f"镜像下载失败 {response.status_code}，[{mirror_key}] 改用官方源: {download_url}")
                                 continue
+                            if mirror_key:
+                                self._mirror_pins.pop(mirror_key, None)
+
+                            # 其他错误或继续失败：切换镜像源
+                            if self.mirror_manager and use_mirror:
+                                logger.warning(f"下载失败 {response.status_code}，尝试切换镜像源...")
+                                if self.mirror_manager.switch_to_fallback():
+                                    download_url = self.mirror_manager.get_download_url(url)
+                                    logger.info(f"已切换到: {self.mirror_manager.current_source.name}, URL: {download_url}")
+                                    continue
                         
-                        raise Exception(f"HTTP {response.status_code}")
+                            raise Exception(f"HTTP {response.status_code}")
                     
-                    total_size = int(response.headers.get("content-length", 0)) or size or 0
-                    downloaded_size = 0
+                        total_size = int(response.headers.get("content-length", 0)) or size or 0
+                        downloaded_size = 0
+                        # 边下载边计算 SHA1，校验时无需再从磁盘读回文件
+                        hasher = hashlib.sha1() if sha1 else None
                     
-                    with open(temp_path, "wb") as f:
-                        for chunk in response.iter_bytes(chunk_size=8192):
-                            if chunk:
-                                f.write(chunk)
-                                downloaded_size += len(chunk)
-                                if progress_callback:
-                                    progress_callback(downloaded_size, total_size)
+                        with open(temp_path, "wb") as f:
+                            # 大文件预分配空间，避免写入过程中反复扩展文件、产生碎片
+                            preallocated = total_size >= PREALLOCATE_THRESHOLD
+                            if preallocated:
+                                f.truncate(total_size)
+                        
+                            for chunk in response.iter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                                if chunk:
+                                    f.write(chunk)
+                                    if hasher:
+                                        hasher.update(chunk)
+                                    downloaded_size += len(chunk)
+                                    if progress_callback:
+                                        progress_callback(downloaded_size, total_size)
+                        
+                            # 实际长度与预分配不一致（如压缩传输）时截断到实际长度
+                            if preallocated and downloaded_size != total_size:
+                                f.truncate(downloaded_size)
+                
+                # 5. 下载完成，校验文件（流式下载时 SHA1 已在写入时计算，分段下载需读回计算）
+                if ranged:
+                    verified = verify_file_integrity(temp_path, sha1, size)
+                elif hasher:
+                    verified = (
+                        hasher.hexdigest() == sha1.lower()
+                        and (not size or downloaded_size == size)
+                    )
+                else:
+                    verified = verify_file_integrity(temp_path, None, size)
                 
-                # 5. 下载完成，校验文件
-                if verify_file_integrity(temp_path, sha1, size):
-                    if save_path.exists():
-                        save_path.unlink()
-                    temp_path.rename(save_path)
+                if verified:
+                    # 临时文件与目标同目录，os.replace 为原子重命名（覆盖已有文件）
+                    os.replace(temp_path, save_path)
+                    if sha1 and self.verified_cache:
+                        self.verified_cache.add(save_path, sha1)
+                    if mirror_key:
+                        self._mirror_pins[mirror_key] = actual_source
                     return True
                 else:
                     logger.warning(f"文件校验失败: {save_path.name} (重试 {retry_count+1}/{max_retries})")
@@ -227,10 +410,21 @@ class HttpDownloader:
                 logger.warning(f"下载异常: {e} (重试 {retry_count+1}/{max_retries}) - {download_url}")
                 retry_count += 1
                 
+                # 目录在下载期间被外部删除时，重试前重新创建
+                if isinstance(e, FileNotFoundError):
+                    self._ready_dirs.discard(save_path.parent)
+                    self.ensure_dir(save_path.parent)
+                
                 # 如果多次失败，尝试切换镜像源
                 if retry_count >= 2 and self.mirror_manager and use_mirror:
-                    if self.mirror_manager.switch_to_fallback():
+                    if mirror_key and actual_source == MirrorSource.BMCLAPI:
+                        self._mirror_pins[mirror_key] = MirrorSource.OFFICIAL
+                        download_url = url
+                        actual_source = MirrorSource.OFFICIAL
+                        logger.info(f"多次失败，[{mirror_key}] 改用官方源: {download_url}")
+                    elif self.mirror_manager.switch_to_fallback():
                         download_url = self.mirror_manager.get_download_url(url)
+                        actual_source = self._detect_source(download_url)
                         logger.info(f"多次失败，切换到镜像源: {self.mirror_manager.current_source.name}, URL: {download_url}")
         
         # 清理临时文件
@@ -242,14 +436,14 @@ class HttpDownloader:
 
     def download_batch(
         self,
-        tasks: list[DownloadTask],
+        tasks: Iterable[DownloadTask],
         progress_callback: Optional[Callable[[DownloadTask], None]] = None
     ) -> Dict[str, Any]:
         """
         批量下载文件（并发）
         
         Args:
-            tasks: 下载任务列表
+            tasks: 下载任务（列表或生成器，生成器会边生成边提交）
             progress_callback: 任务完成回调
             
         Returns:
@@ -265,11 +459,11 @@ class HttpDownloader:
             )
             futures[future] = task
         
-        # 等待所有任务完成
+        # 按完成顺序处理结果，避免排在前面的慢任务阻塞后续任务的进度回调
         completed = 0
         failed = 0
         
-        for future in futures:
+        for future in as_completed(futures):
             task = futures[future]
             try:
                 success = future.result()
@@ -290,13 +484,179 @@ class HttpDownloader:
                 task.error = str(e)
                 failed += 1
         
+        total = len(futures)
         return {
-            "total": len(tasks),
+            "total": total,
             "completed": completed,
             "failed": failed,
-            "success_rate": completed / len(tasks) if tasks else 0
+            "success_rate": completed / total if total else 0
         }
     
+    def _download_ranged(
+        self,
+        download_url: str,
+        temp_path: Path,
+        total_size: int,
+        progress_callback: Optional[Callable[[int, int], None]] = None
+    ) -> bool:
+        """
+        按 Range 分段并发下载到临时文件（各段写入预分配文件的对应偏移）
+        
+        Args:
+            download_url: 下载地址
+            temp_path: 临时文件路径
+            total_size: 文件总大小
+            progress_callback: 进度回调
+            
+        Returns:
+            全部分段下载完成返回 True；服务器不支持 Range 或任一分段失败返回 False
+        """
+        # 探测首字节：确认支持 Range 且大小一致，同时拿到重定向后的最终地址，各分段不再重复跳转
+        # 以流式请求探测，只读响应头：服务器忽略 Range 返回完整内容时不会把整个文件读进内存
+        try:
+            with self.client.stream("GET", download_url, headers={"Range": "bytes=0-0"}, timeout=15.0) as probe:
+                content_range = probe.headers.get("content-range", "")
+                if probe.status_code != 206 or not content_range.endswith(f"/{total_size}"):
+                    return False
+                final_url = str(probe.url)
+        except Exception as e:
+            logger.debug(f"Range 探测失败: {e}")
+            return False
+        
+        # 受限主机上每个分段各占一个并发名额：调用方（批量任务）已持有的名额算作一段，
+        # 其余分段只非阻塞地借用空闲名额，借不到时减少分段数，避免分段突破 HOST_CONCURRENCY_LIMITS
+        slot = self._get_host_slot(final_url)
+        extra_slots = 0
+        if slot is None:
+            parts = RANGED_DOWNLOAD_PARTS
+        else:
+            own_slots = 1 if getattr(self._held_slot, "slot", None) is slot else 0
+            while own_slots + extra_slots < RANGED_DOWNLOAD_PARTS and slot.acquire(blocking=False):
+                extra_slots += 1
+            parts = own_slots + extra_slots
+        
+        try:
+            if parts < 2:
+                return False
+            
+            part_size = -(-total_size // parts)
+            ranges = [(start, min(start + part_size, total_size) - 1) for start in range(0, total_size, part_size)]
+            
+            with open(temp_path, "wb") as f:
+                f.truncate(total_size)
+            
+            downloaded = 0
+            progress_lock = threading.Lock()
+            
+            def fetch_part(start: int, end: int) -> bool:
+                nonlocal downloaded
+                expected = end - start + 1
+                written = 0
+                with open(temp_path, "r+b") as f:
+                    f.seek(start)
+                    headers = {"Range": f"bytes={start}-{end}"}
+                    with self.client.stream("GET", final_url, headers=headers, timeout=60.0) as response:
+                        if response.status_code != 206:
+                            return False
+                        for chunk in response.iter_bytes(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                            written += len(chunk)
+                            if written > expected:
+                                return False
+                            f.write(chunk)
+                            if progress_callback:
+                                # 在锁内回调，保证多段汇总的进度单调递增（限频包装也依赖调用顺序）
+                                with progress_lock:
+                                    downloaded += len(chunk)
+                                    progress_callback(downloaded, total_size)
+                return written == expected
+            
+            logger.info(f"分段下载: {temp_path.name}, {len(ranges)} 段")
+            with ThreadPoolExecutor(max_workers=len(ranges), thread_name_prefix="range") as pool:
+                futures = [pool.submit(fetch_part, start, end) for start, end in ranges]
+                try:
+                    return all([future.result() for future in futures])
+                except Exception as e:
+                    logger.warning(f"分段下载失败: {e}")
+                    return False
+        finally:
+            for _ in range(extra_slots):
+                slot.release()
+    
+    def fetch_bytes_racing(self, url: str, sha1: Optional[str] = None, timeout: float = 30.0) -> Optional[bytes]:
+        """
+        同时向镜像和官方源请求小文件，采用最先返回且校验通过的结果
+        
+        适用于资源索引等关键路径上的小文件：镜像超时或出错时无需等待重试退避再回退官方源。
+        
+        Args:
+            url: 原始 URL
+            sha1: 期望的 SHA1 值
+            timeout: 单个请求超时时间（秒）
+            
+        Returns:
+            文件内容，所有来源均失败返回 None
+        """
+        candidates = [self.mirror_manager.get_download_url(url)]
+        if url not in candidates:
+            candidates.append(url)
+        
+        # 独立的小线程池：批量下载可能已占满 self.executor 的队列
+        race_pool = ThreadPoolExecutor(max_workers=len(candidates), thread_name_prefix="race")
+        futures = [race_pool.submit(self._fetch_verified, candidate, sha1, timeout) for candidate in candidates]
+        try:
+            for future in as_completed(futures):
+                data = future.result()
+                if data is not None:
+                    return data
+        finally:
+            # 不等待落败的请求结束
+            race_pool.shutdown(wait=False, cancel_futures=True)
+        
+        return None
+    
+    def _fetch_verified(self, url: str, sha1: Optional[str], timeout: float) -> Optional[bytes]:
+        """请求单个来源并校验 SHA1，失败返回 None"""
+        try:
+            response = self.client.get(url, timeout=timeout)
+            response.raise_for_status()
+        except Exception as e:
+            logger.debug(f"请求失败: {url}, {e}")
+            return None
+        
+        data = response.content
+        if sha1 and hashlib.sha1(data).hexdigest() != sha1.lower():
+            logger.warning(f"文件校验失败: {url}")
+            return None
+        return data
+    
+    def prewarm(self, urls, timeout: float = 5.0):
+        """
+        预先建立到下载主机的连接（TLS + HTTP/2 握手），后续下载直接复用
+        
+        每个主机一个 HEAD 请求，提交到下载线程池后立即返回，各主机并行握手，不阻塞调用方
+        
+        Args:
+            urls: 即将下载的原始 URL（按镜像转换后取主机，每个主机只请求一次）
+            timeout: 单个预热请求超时时间（秒）
+        """
+        origins = []
+        for url in urls:
+            parts = urlsplit(self.mirror_manager.get_download_url(url))
+            origin = f"{parts.scheme}://{parts.netloc}/"
+            if origin not in origins:
+                origins.append(origin)
+        
+        for origin in origins:
+            self.executor.submit(self._prewarm_origin, origin, timeout)
+    
+    def _prewarm_origin(self, origin: str, timeout: float):
+        """向单个主机发送预热请求"""
+        try:
+            self.client.head(origin, timeout=timeout)
+        except Exception as e:
+            # 预热失败不影响下载，正式请求时会重新建立连接
+            logger.debug(f"连接预热失败: {origin}, {e}")
+    
     def _download_task_wrapper(self, task: DownloadTask) -> bool:
         """下载任务包装器"""
         task.status = "downloading"
@@ -305,23 +665,57 @@ class HttpDownloader:
             task.downloaded_bytes = downloaded
             task.total_bytes = total
         
-        success = self.download_file(
-            task.url,
-            task.save_path,
-            task.sha1,
-            progress_callback=task_progress
-        )
+        # 按主机限流：同一主机的在途请求数不超过 HOST_CONCURRENCY_LIMITS
+        # 与 download_file 一样按 mirror_key 的固定源解析主机（已改用官方源的分片不占镜像名额）
+        pinned_source = self._mirror_pins.get(task.mirror_key) if task.mirror_key else None
+        slot = self._get_host_slot(self.mirror_manager.get_download_url(task.url, pinned_source))
+        with slot or contextlib.nullcontext():
+            # 记录当前线程持有的名额，分段下载据此只为额外分段借用名额
+            self._held_slot.slot = slot
+            try:
+                return self.download_file(
+                    task.url,
+                    task.save_path,
+                    task.sha1,
+                    task.size,
+                    progress_callback=task_progress,
+                    mirror_key=task.mirror_key
+                )
+            finally:
+                self._held_slot.slot = None
+    
+    def _get_host_slot(self, url: str) -> Optional[threading.BoundedSemaphore]:
+        """
+        获取 URL 所在主机的并发信号量
         
-        return success
+        Args:
+            url: 下载地址（镜像转换后）
+            
+        Returns:
+            信号量，主机不限并发时返回 None
+        """
+        host = urlsplit(url).hostname
+        limit = HOST_CONCURRENCY_LIMITS.get(host)
+        if limit is None:
+            return None
+        
+        slot = self._host_slots.get(host)
+        if slot is None:
+            with self._host_slots_lock:
+                slot = self._host_slots.setdefault(host, threading.BoundedSemaphore(limit))
+        return slot
+    
+    @staticmethod
+    def _detect_source(download_url: str) -> MirrorSource:
+        """根据 URL 判断实际使用的镜像源"""
+        if "bmclapi2.bangbang93.com" in download_url or "bmclapi.bangbang93.com" in download_url:
+            return MirrorSource.BMCLAPI
+        return MirrorSource.OFFICIAL
     
     def _verify_sha1(self, file_path: Path, expected_sha1: str) -> bool:
         """验证文件 SHA1"""
         try:
-            sha1 = hashlib.sha1()
-            with open(file_path, "rb") as f:
-                while chunk := f.read(8192):
-                    sha1.update(chunk)
-            return sha1.hexdigest().lower() == expected_sha1.lower()
+            return file_sha1(file_path) == expected_sha1.lower()
         except Exception as e:
             logger.error(f"SHA1 校验异常: {e}")
             return False
@@ -341,7 +735,7 @@ class HttpDownloader:
         
         for attempt in range(self.max_retries):
             try:
-                response = self.client.get(download_url)
+                response = self.meta_client.get(download_url, headers=self._meta_headers)
                 
                 # 429 错误切换官方源
                 if response.status_code == 429:
@@ -359,9 +753,53 @@ class HttpDownloader:
         
         return None
     
+    def get_json_conditional(
+        self,
+        url: str,
+        etag: Optional[str] = None,
+        use_mirror: bool = True
+    ) -> Tuple[int, Optional[dict], Optional[str]]:
+        """
+        条件获取 JSON 数据（If-None-Match）
+        
+        Args:
+            url: 请求地址
+            etag: 上次响应的 ETag，为空时等同普通 GET
+            use_mirror: 是否使用镜像
+            
+        Returns:
+            (状态码, JSON 数据, ETag)；304 时数据为 None，失败时状态码为 0
+        """
+        download_url = self.mirror_manager.get_download_url(url) if use_mirror else url
+        headers = dict(self._meta_headers)
+        if etag:
+            headers["If-None-Match"] = etag
+        
+        for attempt in range(self.max_retries):
+            try:
+                response = self.meta_client.get(download_url, headers=headers)
+                
+                # 429 错误切换官方源
+                if response.status_code == 429:
+                    logger.warning("遇到 429 限流，切换到官方源")
+                    download_url = url
+                    continue
+                
+                if response.status_code == 304:
+                    return 304, None, etag
+                
+                response.raise_for_status()
+                return response.status_code, response.json(), response.headers.get("etag")
+            
+            except Exception as e:
+                logger.error(f"获取 JSON 失败 (尝试 {attempt + 1}/{self.max_retries}): {e}")
+        
+        return 0, None, None
+    
     def close(self):
-        """关闭下载器，释放资源"""
-        self.client.close()
+        """关闭下载器，释放资源（共享的元数据客户端由进程统一管理，不在此关闭）"""
+        if self._client is not None:
+            self._client.close()
         self.executor.shutdown(wait=True)
     
     def __enter__(self):
@@ -0,0 +1,70 @@
+"""
+JSON 编解码工具
+优先使用 orjson（C 实现，直接处理 UTF-8 bytes），未安装时回退到标准库 json
+"""
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def json_loads(data: bytes) -> Any:
+    """
+    解析 JSON
+
+    Args:
+        data: UTF-8 编码的 JSON 数据
+
+    Returns:
+        解析结果
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any, indent: bool = True) -> bytes:
+    """
+    序列化为 UTF-8 编码的 JSON（非 ASCII 字符原样输出）
+
+    Args:
+        obj: 待序列化对象
+        indent: 是否使用 2 空格缩进
+
+    Returns:
+        JSON bytes
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode("utf-8")
+
+
+def atomic_write_bytes(path: Path, data: bytes):
+    """
+    原子写入文件：先写同目录临时文件再 os.replace 替换，
+    进程中断时读取方只会看到旧文件或完整的新文件，不会读到写了一半的内容。
+    每次调用使用独立的临时文件，多个管理器同时写同一目标时互不干扰
+
+    Args:
+        path: 目标文件路径
+        data: 文件内容
+    """
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
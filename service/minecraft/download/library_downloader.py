@@ -51,10 +51,13 @@ class LibraryDownloader:
         if total_libs == 0:
             return True
         
-        # 创建下载任务
-        download_tasks = []
+        # 创建下载任务（按保存路径去重，同一文件只下载一次）
+        tasks_by_path: Dict[Path, DownloadTask] = {}
         native_tasks = []  # 需要解压的 natives
         
+        def add_task(task: DownloadTask) -> DownloadTask:
+            return tasks_by_path.setdefault(task.save_path, task)
+        
         logger.info(f"🔍 开始解析 {total_libs} 个依赖库...")
         
         for idx, lib in enumerate(libraries, 1):
@@ -66,12 +69,12 @@ class LibraryDownloader:
             if artifact:
                 task = self._create_library_task(artifact, lib.get("name", "unknown"))
                 if task:
-                    download_tasks.append(task)
+                    add_task(task)
             elif "name" in lib and "url" in lib:
                 # Fabric格式：直接有name和url字段，没有downloads结构
                 task = self._create_fabric_library_task(lib)
                 if task:
-                    download_tasks.append(task)
+                    add_task(task)
             
             # 处理 natives（平台相关的本地库）
             classifiers = downloads.get("classifiers")
@@ -92,20 +95,26 @@ class LibraryDownloader:
                             f"{lib.get('name', 'unknown')} (native)"
                         )
                         if task:
-                            download_tasks.append(task)
-                            native_tasks.append((task, lib.get("extract", {})))
+                            native_tasks.append((add_task(task), lib.get("extract", {})))
+        
+        download_tasks = list(tasks_by_path.values())
+        
+        # 批量下载（回调在 download_batch 的调用线程中执行，计数无需加锁）
+        completed = 0
         
-        # 批量下载
         def batch_progress(task: DownloadTask):
-            completed = sum(1 for t in download_tasks if t.status == "completed")
+            nonlocal completed
+            if task.status == "failed":
+                logger.warning(f"✗ {task.description}")
+                return
+            
+            completed += 1
             if progress_callback:
                 progress_callback(completed, total_libs)
             
             # 每 10 个库输出一次日志
-            if task.status == "completed" and completed % 10 == 0:
+            if completed % 10 == 0:
                 logger.info(f"✅ 已下载 {completed}/{total_libs} 个依赖库")
-            elif task.status == "failed":
-                logger.warning(f"✗ {task.description}")
         
         result = self.downloader.download_batch(download_tasks, batch_progress)
         
@@ -154,7 +163,8 @@ class LibraryDownloader:
             url=url,
             save_path=save_path,
             sha1=sha1,
-            description=f"Library: {lib_name}"
+            description=f"Library: {lib_name}",
+            size=artifact_info.get("size")
         )
     
     def _create_fabric_library_task(
@@ -200,7 +210,7 @@ class LibraryDownloader:
         
         # 如果文件已存在，跳过
         if save_path.exists():
-            logger.debug(f"库已存在，跳过: {name}")
+            logger.debug("库已存在，跳过: %s", name)
             return None
         
         # 构建完整的下载URL
@@ -222,9 +232,7 @@ class LibraryDownloader:
                 # 默认使用 BMCL Maven 镜像
                 download_url = f"https://bmclapi2.bangbang93.com/maven/{relative_path}"
         
-        logger.debug(f"库: {name}")
-        logger.debug(f"  下载URL: {download_url}")
-        logger.debug(f"  保存路径: {save_path}")
+        logger.debug("库: %s\n  下载URL: %s\n  保存路径: %s", name, download_url, save_path)
         
         return DownloadTask(
             url=download_url,
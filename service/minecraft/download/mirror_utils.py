@@ -2,6 +2,8 @@
 Minecraft 镜像源管理工具
 支持自动切换镜像源，优先使用国内加速源
 """
+import functools
+import re
 from typing import List, Optional
 from enum import Enum
 
@@ -21,6 +23,9 @@ class MirrorConfig:
         MirrorSource.OFFICIAL: "https://piston-meta.mojang.com/mc/game/version_manifest_v2.json"
     }
     
+    # 资源文件（assets/objects）根地址
+    ASSETS_BASE_URL = "https://resources.download.minecraft.net/"
+    
     # 资源域名映射
     DOMAIN_MAPPING = {
         MirrorSource.BMCLAPI: {
@@ -58,6 +63,63 @@ class MirrorConfig:
     }
 
 
+def _build_domain_pattern(source: MirrorSource) -> Optional[re.Pattern]:
+    """
+    将镜像源的域名映射表预编译为一个正则（所有域名的交替匹配）
+    
+    Args:
+        source: 镜像源
+        
+    Returns:
+        预编译的正则，无映射时返回 None
+    """
+    domains = MirrorConfig.DOMAIN_MAPPING.get(source)
+    if not domains:
+        return None
+    return re.compile("|".join(re.escape(domain) for domain in domains))
+
+
+# 每个镜像源一次正则搜索替代对映射表逐项做子串检查；
+# URL 中最先出现的域名即主机名，与逐项检查的结果一致
+_DOMAIN_PATTERNS = {source: _build_domain_pattern(source) for source in MirrorSource}
+
+
+@functools.lru_cache(maxsize=4096)
+def _convert_url(url: str, source: MirrorSource) -> str:
+    """
+    按镜像源转换 URL（纯函数，进程内缓存：版本 JSON、依赖库等 URL 在多次安装间大量重复）
+    
+    Args:
+        url: 原始 URL
+        source: 镜像源
+        
+    Returns:
+        转换后的 URL
+    """
+    # Liteloader 特例：直接替换为 BMCL 路径（更换域名与固定路径）
+    if "dl.liteloader.com/versions/versions.json" in url:
+        return url.replace("http://dl.liteloader.com/versions/versions.json",
+                           "https://bmclapi.bangbang93.com/maven/com/mumfrey/liteloader/versions.json")
+
+    # 检查域名映射
+    pattern = _DOMAIN_PATTERNS.get(source)
+    match = pattern.search(url) if pattern else None
+    if not match:
+        return url
+
+    original_domain = match.group()
+    mirror_domain = MirrorConfig.DOMAIN_MAPPING[source][original_domain]
+    prefix = MirrorConfig.PATH_PREFIX_MAPPING.get(source, {}).get(original_domain, "")
+    new_url = url.replace(original_domain, mirror_domain + prefix)
+
+    # Neoforge 特例：移除 releases 路径段
+    if source == MirrorSource.BMCLAPI:
+        if original_domain == "maven.neoforged.net" and "/releases/" in new_url:
+            new_url = new_url.replace("/maven/releases/", "/maven/")
+
+    return new_url
+
+
 class MirrorManager:
     """镜像管理器"""
     
@@ -73,40 +135,30 @@ class MirrorManager:
         """获取版本清单 URL"""
         return MirrorConfig.VERSION_MANIFEST_URLS[self.current_source]
     
-    def get_download_url(self, url: str) -> str:
+    def get_download_url(self, url: str, source: Optional[MirrorSource] = None) -> str:
         """
         获取下载 URL（根据当前镜像源自动替换）
         优先使用国内镜像；当当前源为 OFFICIAL 时原样返回，以便真正回退到官方源。
+        
+        Args:
+            url: 原始 URL
+            source: 指定镜像源，None 则使用当前镜像源
         """
         if not url:
             return url
 
+        source = source or self.current_source
+
         # 当前源明确为官方时，不做任何替换，确保回退生效
-        if self.current_source == MirrorSource.OFFICIAL:
+        if source == MirrorSource.OFFICIAL:
             return url
 
-        # Liteloader 特例：直接替换为 BMCL 路径（更换域名与固定路径）
-        if "dl.liteloader.com/versions/versions.json" in url:
-            return url.replace("http://dl.liteloader.com/versions/versions.json",
-                               "https://bmclapi.bangbang93.com/maven/com/mumfrey/liteloader/versions.json")
+        # 资源对象数以万计且 URL 各不相同，只转换一次根地址后做前缀替换，
+        # 不逐个走域名匹配，也不挤占 _convert_url 的缓存
+        if url.startswith(MirrorConfig.ASSETS_BASE_URL):
+            return _convert_url(MirrorConfig.ASSETS_BASE_URL, source) + url[len(MirrorConfig.ASSETS_BASE_URL):]
 
-        # 检查域名映射
-        mapping = MirrorConfig.DOMAIN_MAPPING.get(self.current_source, {})
-        prefix_mapping = MirrorConfig.PATH_PREFIX_MAPPING.get(self.current_source, {})
-
-        for original_domain, mirror_domain in mapping.items():
-            if original_domain in url:
-                prefix = prefix_mapping.get(original_domain, "")
-                new_url = url.replace(original_domain, mirror_domain + prefix)
-
-                # Neoforge 特例：移除 releases 路径段
-                if self.current_source == MirrorSource.BMCLAPI:
-                    if original_domain == "maven.neoforged.net" and "/releases/" in new_url:
-                        new_url = new_url.replace("/maven/releases/", "/maven/")
-
-                return new_url
-
-        return url
+        return _convert_url(url, source)
 
     def switch_to_fallback(self):
         """切换到备用源"""
@@ -0,0 +1,266 @@
+"""
+Minecraft 下载模块离线测试（无需网络）
+覆盖已校验文件缓存的失效规则、JSON 工具、镜像 URL 转换和版本类型推断
+"""
+import os
+from pathlib import Path
+
+import pytest
+
+from service.minecraft.download.download_manager import _guess_type_from_id
+from service.minecraft.download.json_utils import json_loads, json_dumps, atomic_write_bytes
+from service.minecraft.download.mirror_utils import MirrorManager, MirrorSource, _convert_url
+from service.minecraft.download.verified_cache import VerifiedCache
+
+
+SHA1 = "0123456789abcdef0123456789abcdef01234567"
+
+
+def _write(path: Path, data: bytes) -> Path:
+    path.write_bytes(data)
+    return path
+
+
+# ==================== 已校验文件缓存 ====================
+
+def test_verified_cache_miss_without_entry(tmp_path):
+    """未记录的文件不命中"""
+    cache = VerifiedCache(tmp_path)
+    file_path = _write(tmp_path / "a.jar", b"data")
+
+    assert not cache.is_verified(file_path, SHA1)
+
+
+def test_verified_cache_hit_after_add(tmp_path):
+    """记录后命中，SHA1 不区分大小写"""
+    cache = VerifiedCache(tmp_path)
+    file_path = _write(tmp_path / "a.jar", b"data")
+    cache.add(file_path, SHA1.upper())
+
+    assert cache.is_verified(file_path, SHA1)
+    assert cache.is_verified(file_path, SHA1.upper())
+
+
+def test_verified_cache_miss_on_other_sha1(tmp_path):
+    """期望的 SHA1 与记录不同则不命中"""
+    cache = VerifiedCache(tmp_path)
+    file_path = _write(tmp_path / "a.jar", b"data")
+    cache.add(file_path, SHA1)
+
+    assert not cache.is_verified(file_path, "f" * 40)
+
+
+def test_verified_cache_miss_on_size_change(tmp_path):
+    """文件大小变化（mtime 保持不变）则不命中"""
+    cache = VerifiedCache(tmp_path)
+    file_path = _write(tmp_path / "a.jar", b"data")
+    cache.add(file_path, SHA1)
+    st = os.stat(file_path)
+
+    _write(file_path, b"corrupted data")
+    os.utime(file_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+    assert not cache.is_verified(file_path, SHA1)
+
+
+def test_verified_cache_miss_on_mtime_change(tmp_path):
+    """文件被改写（大小相同，mtime 变化）则不命中"""
+    cache = VerifiedCache(tmp_path)
+    file_path = _write(tmp_path / "a.jar", b"data")
+    cache.add(file_path, SHA1)
+    st = os.stat(file_path)
+
+    _write(file_path, b"DATA")
+    os.utime(file_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    assert not cache.is_verified(file_path, SHA1)
+
+
+def test_verified_cache_miss_on_missing_file(tmp_path):
+    """文件被删除则不命中"""
+    cache = VerifiedCache(tmp_path)
+    file_path = _write(tmp_path / "a.jar", b"data")
+    cache.add(file_path, SHA1)
+    file_path.unlink()
+
+    assert not cache.is_verified(file_path, SHA1)
+
+
+def test_verified_cache_uses_given_stat_result(tmp_path):
+    """传入的 stat 结果参与比较（与记录不一致时不命中）"""
+    cache = VerifiedCache(tmp_path)
+    file_path = _write(tmp_path / "a.jar", b"data")
+    other = _write(tmp_path / "b.jar", b"other data")
+    cache.add(file_path, SHA1)
+
+    assert cache.is_verified(file_path, SHA1, os.stat(file_path))
+    assert not cache.is_verified(file_path, SHA1, os.stat(other))
+
+
+def test_verified_cache_add_missing_file_is_ignored(tmp_path):
+    """记录不存在的文件不会产生条目"""
+    cache = VerifiedCache(tmp_path)
+    cache.add(tmp_path / "missing.jar", SHA1)
+
+    assert len(cache) == 0
+
+
+def test_verified_cache_prune(tmp_path):
+    """prune 只移除已不存在的文件记录"""
+    cache = VerifiedCache(tmp_path)
+    kept = _write(tmp_path / "kept.jar", b"kept")
+    removed = _write(tmp_path / "removed.jar", b"removed")
+    cache.add(kept, SHA1)
+    cache.add(removed, SHA1)
+    removed.unlink()
+
+    cache.prune()
+
+    assert len(cache) == 1
+    assert cache.is_verified(kept, SHA1)
+
+
+def test_verified_cache_save_load_round_trip(tmp_path):
+    """保存后新实例可读回记录，且失效规则不变"""
+    cache = VerifiedCache(tmp_path)
+    file_path = _write(tmp_path / "a.jar", b"data")
+    cache.add(file_path, SHA1)
+    cache.save()
+
+    reloaded = VerifiedCache(tmp_path)
+    assert len(reloaded) == 1
+    assert reloaded.is_verified(file_path, SHA1)
+
+    _write(file_path, b"changed")
+    assert not reloaded.is_verified(file_path, SHA1)
+
+
+def test_verified_cache_save_skips_when_clean(tmp_path):
+    """没有改动时不写文件"""
+    cache = VerifiedCache(tmp_path)
+    cache.save()
+
+    assert not cache.cache_file.exists()
+
+
+def test_verified_cache_ignores_corrupt_file(tmp_path):
+    """缓存文件损坏时按空缓存处理"""
+    (tmp_path / VerifiedCache.CACHE_FILE_NAME).write_bytes(b"{not json")
+    cache = VerifiedCache(tmp_path)
+
+    assert len(cache) == 0
+
+
+def test_verified_cache_clear(tmp_path):
+    """clear 清空记录并删除缓存文件"""
+    cache = VerifiedCache(tmp_path)
+    file_path = _write(tmp_path / "a.jar", b"data")
+    cache.add(file_path, SHA1)
+    cache.save()
+
+    cache.clear()
+
+    assert len(cache) == 0
+    assert not cache.cache_file.exists()
+    assert not cache.is_verified(file_path, SHA1)
+
+
+# ==================== JSON 工具 ====================
+
+def test_json_round_trip_keeps_non_ascii():
+    """非 ASCII 字符原样输出，且可读回"""
+    data = {"name": "花园", "list": [1, 2.5, None, True]}
+
+    assert "花园".encode("utf-8") in json_dumps(data)
+    assert json_loads(json_dumps(data)) == data
+    assert json_loads(json_dumps(data, indent=False)) == data
+
+
+def test_json_dumps_compact():
+    """indent=False 输出单行"""
+    assert b"\n" not in json_dumps({"a": [1, 2]}, indent=False)
+
+
+def test_atomic_write_bytes_replaces_target(tmp_path):
+    """覆盖已有文件，且不留下临时文件"""
+    target = _write(tmp_path / "data.json", b"old")
+
+    atomic_write_bytes(target, b"new")
+
+    assert target.read_bytes() == b"new"
+    assert os.listdir(tmp_path) == ["data.json"]
+
+
+def test_atomic_write_bytes_keeps_target_on_failure(tmp_path):
+    """写入失败时保留原文件并清理临时文件"""
+    target = _write(tmp_path / "data.json", b"old")
+
+    with pytest.raises(TypeError):
+        atomic_write_bytes(target, "not bytes")
+
+    assert target.read_bytes() == b"old"
+    assert os.listdir(tmp_path) == ["data.json"]
+
+
+# ==================== 镜像 URL 转换 ====================
+
+def test_convert_url_maps_known_domains():
+    """已知域名替换为 BMCLAPI 对应路径"""
+    assert _convert_url(
+        "https://libraries.minecraft.net/org/ow2/asm/asm/9.6/asm-9.6.jar", MirrorSource.BMCLAPI
+    ) == "https://bmclapi2.bangbang93.com/maven/org/ow2/asm/asm/9.6/asm-9.6.jar"
+    assert _convert_url(
+        "https://piston-meta.mojang.com/v1/packages/abc/1.20.1.json", MirrorSource.BMCLAPI
+    ) == "https://bmclapi2.bangbang93.com/v1/packages/abc/1.20.1.json"
+
+
+def test_convert_url_neoforge_drops_releases():
+    """NeoForge 仓库去掉 releases 路径段"""
+    assert _convert_url(
+        "https://maven.neoforged.net/releases/net/neoforged/neoforge/20.4.80/x.jar", MirrorSource.BMCLAPI
+    ) == "https://bmclapi2.bangbang93.com/maven/net/neoforged/neoforge/20.4.80/x.jar"
+
+
+def test_convert_url_leaves_unknown_domains():
+    """未知域名和官方源不做替换"""
+    url = "https://cdn.modrinth.com/data/P7dR8mSH/versions/x/fabric-api.jar"
+    assert _convert_url(url, MirrorSource.BMCLAPI) == url
+    assert _convert_url("https://libraries.minecraft.net/a.jar", MirrorSource.OFFICIAL) == \
+        "https://libraries.minecraft.net/a.jar"
+
+
+def test_get_download_url_assets_prefix():
+    """资源对象按根地址前缀替换，与逐个转换结果一致"""
+    manager = MirrorManager()
+    url = "https://resources.download.minecraft.net/ab/abcdef0123"
+
+    assert manager.get_download_url(url) == "https://bmclapi2.bangbang93.com/assets/ab/abcdef0123"
+    assert manager.get_download_url(url) == _convert_url(url, MirrorSource.BMCLAPI)
+    assert manager.get_download_url(url, MirrorSource.OFFICIAL) == url
+
+
+def test_get_download_url_official_source():
+    """当前源为官方时原样返回"""
+    manager = MirrorManager()
+    manager.set_source(MirrorSource.OFFICIAL)
+    url = "https://libraries.minecraft.net/a.jar"
+
+    assert manager.get_download_url(url) == url
+    assert manager.get_download_url("") == ""
+
+
+# ==================== 版本类型推断 ====================
+
+@pytest.mark.parametrize("version_id, expected", [
+    ("1.20.1", "release"),
+    ("23w45a", "snapshot"),
+    ("1.20.2-pre1", "snapshot"),
+    ("1.20.2-rc1", "snapshot"),
+    ("fabric-loader-0.15.7-1.20.1", "fabric"),
+    ("1.20.1-forge-47.2.0", "forge"),
+    ("neoforge-20.4.80", "neoforge"),
+    ("1.20.1-OptiFine_HD_U_I6", "optifine"),
+])
+def test_guess_type_from_id(version_id, expected):
+    """仅凭版本 ID 推断版本类型"""
+    assert _guess_type_from_id(version_id) == expected
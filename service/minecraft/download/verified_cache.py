@@ -0,0 +1,138 @@
+"""
+已校验文件缓存
+记录已通过 SHA1 校验的文件（路径 → sha1/大小/修改时间），
+再次安装时只需一次 stat 即可确认文件完整，无需重新读取并计算哈希
+"""
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+from utils.logger import logger
+from .json_utils import json_loads, json_dumps, atomic_write_bytes
+
+
+class VerifiedCache:
+    """已校验文件缓存（持久化到 Minecraft 目录）"""
+
+    CACHE_FILE_NAME = ".flowergame_verified"
+
+    def __init__(self, minecraft_dir: Path):
+        """
+        初始化已校验文件缓存
+
+        Args:
+            minecraft_dir: Minecraft 根目录
+        """
+        self.cache_file = Path(minecraft_dir) / self.CACHE_FILE_NAME
+        self._entries: Dict[str, List] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        # 首次使用时才读取缓存文件（只查询版本列表的管理器不需要它）
+        self._loaded = False
+
+    def is_verified(self, file_path: Path, sha1: str, stat_result: Optional[os.stat_result] = None) -> bool:
+        """
+        检查文件是否已通过校验且之后未被修改
+
+        Args:
+            file_path: 文件路径
+            sha1: 期望的 SHA1 值
+            stat_result: 调用方已有的 stat 结果（如 os.scandir 的 DirEntry.stat()），避免重复 stat
+
+        Returns:
+            缓存命中且文件未变化返回 True
+        """
+        self._ensure_loaded()
+        entry = self._entries.get(os.fspath(file_path))
+        if not entry or entry[0] != sha1.lower():
+            return False
+
+        st = stat_result
+        if st is None:
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                return False
+
+        return st.st_size == entry[1] and st.st_mtime_ns == entry[2]
+
+    def add(self, file_path: Path, sha1: str):
+        """
+        记录一个已通过校验的文件
+
+        Args:
+            file_path: 文件路径
+            sha1: 文件 SHA1 值
+        """
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return
+
+        self._ensure_loaded()
+        with self._lock:
+            self._entries[os.fspath(file_path)] = [sha1.lower(), st.st_size, st.st_mtime_ns]
+            self._dirty = True
+
+    def prune(self):
+        """移除已不存在的文件记录（如删除版本后）"""
+        self._ensure_loaded()
+        with self._lock:
+            missing = [path for path in self._entries if not os.path.exists(path)]
+            for path in missing:
+                del self._entries[path]
+            if missing:
+                self._dirty = True
+
+        if missing:
+            logger.debug(f"已清理 {len(missing)} 条失效的校验记录")
+
+    def save(self):
+        """保存到磁盘（仅在有改动时写入）"""
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = dict(self._entries)
+            self._dirty = False
+
+        try:
+            atomic_write_bytes(self.cache_file, json_dumps(entries, indent=False))
+        except Exception as e:
+            logger.warning(f"保存校验缓存失败: {e}")
+
+    def clear(self):
+        """清除缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._dirty = False
+            self._loaded = True
+
+        if self.cache_file.exists():
+            self.cache_file.unlink()
+
+    def _ensure_loaded(self):
+        """首次访问时从磁盘加载"""
+        if self._loaded:
+            return
+
+        with self._lock:
+            if not self._loaded:
+                self._load()
+                self._loaded = True
+
+    def _load(self):
+        """从磁盘加载（需持有 _lock）"""
+        if not self.cache_file.exists():
+            return
+
+        try:
+            data = json_loads(self.cache_file.read_bytes())
+            if isinstance(data, dict):
+                self._entries = data
+        except Exception as e:
+            logger.warning(f"读取校验缓存失败: {e}")
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._entries)
+
@@ -2,19 +2,22 @@
 Minecraft 版本 JSON 解析
 解析版本配置文件，提取下载信息
 """
+import functools
 import platform
 from typing import Dict, Any, Optional, List
 from pathlib import Path
 from utils.logger import logger
 from .http_downloader import HttpDownloader
+from .json_utils import json_dumps, atomic_write_bytes
 
 
 class RuleEvaluator:
     """规则评估器"""
     
     @staticmethod
+    @functools.lru_cache(maxsize=None)
     def get_os_name() -> str:
-        """获取操作系统名称（Minecraft 格式）"""
+        """获取操作系统名称（Minecraft 格式，进程内只检测一次）"""
         system = platform.system().lower()
         if system == "windows":
             return "windows"
@@ -25,8 +28,9 @@ class RuleEvaluator:
         return system
     
     @staticmethod
+    @functools.lru_cache(maxsize=None)
     def get_os_arch() -> str:
-        """获取系统架构"""
+        """获取系统架构（进程内只检测一次）"""
         machine = platform.machine().lower()
         if machine in ("amd64", "x86_64"):
             return "x64"
@@ -174,14 +178,12 @@ class VersionInfo:
         if not filter_by_rules:
             return libraries
         
-        # 根据规则过滤
-        filtered_libraries = []
-        for lib in libraries:
-            rules = lib.get("rules", [])
-            if RuleEvaluator.evaluate_rules(rules):
-                filtered_libraries.append(lib)
-        
-        return filtered_libraries
+        # 根据规则过滤（无规则的库直接保留，不进入规则评估）
+        evaluate_rules = RuleEvaluator.evaluate_rules
+        return [
+            lib for lib in libraries
+            if not lib.get("rules") or evaluate_rules(lib["rules"])
+        ]
     
     def get_main_class(self) -> Optional[str]:
         """获取主类名"""
@@ -227,13 +229,11 @@ class VersionInfo:
     def save_version_json(self) -> bool:
         """保存版本 JSON 到本地"""
         try:
-            import json
-            
             version_json_path = self.get_version_json_path()
             version_json_path.parent.mkdir(parents=True, exist_ok=True)
             
-            with open(version_json_path, "w", encoding="utf-8") as f:
-                json.dump(self.data, f, ensure_ascii=False, indent=2)
+            # 紧凑格式：启动器解析不需要缩进，文件更小、序列化更快
+            atomic_write_bytes(version_json_path, json_dumps(self.data, indent=False))
             
             logger.info(f"版本 JSON 已保存: {version_json_path}")
             return True
@@ -2,13 +2,14 @@
 Minecraft 版本清单管理
 支持缓存和版本查询
 """
-import json
+import threading
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta
 from utils.logger import logger
 from .http_downloader import HttpDownloader
 from .mirror_utils import MirrorManager
+from .json_utils import json_loads, json_dumps, atomic_write_bytes
 
 
 class VersionManifest:
@@ -16,6 +17,11 @@ class VersionManifest:
     
     CACHE_EXPIRY_HOURS = 24  # 缓存有效期（小时）
     
+    # 进程内缓存：(缓存文件路径, mtime_ns, 大小) → 已解析的缓存数据
+    # 下载管理器按请求创建，文件未变化时后续实例无需重新读取和解析
+    _cache_memo: Optional[tuple] = None
+    _cache_memo_lock = threading.Lock()
+    
     @classmethod
     def _get_cache_dir(cls):
         """获取缓存目录"""
@@ -50,6 +56,14 @@ class VersionManifest:
         self.downloader = downloader or HttpDownloader(mirror_manager=mirror_manager)
         self.mirror_manager = mirror_manager or MirrorManager()
         self.manifest_data: Optional[Dict[str, Any]] = None
+        # 版本 ID / 类型索引，随清单一起构建，避免每次查询线性扫描
+        self._versions_by_id: Dict[str, Dict[str, Any]] = {}
+        self._versions_by_type: Dict[str, List[Dict[str, Any]]] = {}
+        self.etag: Optional[str] = None
+        # 已过期的缓存清单，服务端返回 304 时直接复用
+        self._stale_manifest: Optional[Dict[str, Any]] = None
+        # 防止预取线程与调用方同时加载
+        self._load_lock = threading.Lock()
     
     def load_manifest(self, force_refresh: bool = False) -> bool:
         """
@@ -61,21 +75,40 @@ class VersionManifest:
         Returns:
             是否加载成功
         """
+        with self._load_lock:
+            # 已由其他线程（如预取）加载完成
+            if not force_refresh and self.manifest_data:
+                return True
+            
+            return self._load_manifest(force_refresh)
+    
+    def _load_manifest(self, force_refresh: bool) -> bool:
+        """加载版本清单（需持有 _load_lock）"""
         # 尝试从缓存加载
         if not force_refresh and self._load_from_cache():
             logger.info("从缓存加载版本清单成功")
             return True
         
-        # 从网络下载
+        # 从网络下载（有过期缓存时带 ETag 条件请求，未变化则无需重新下载）
         logger.info("正在从网络获取版本清单...")
         manifest_url = self.mirror_manager.get_version_manifest_url()
         
-        manifest_data = self.downloader.get_json(manifest_url, use_mirror=True)
+        etag = self.etag if self._stale_manifest and not force_refresh else None
+        status, manifest_data, etag = self.downloader.get_json_conditional(
+            manifest_url, etag=etag, use_mirror=True
+        )
+        
+        if status == 304:
+            logger.info("版本清单未变化，继续使用缓存")
+            manifest_data = self._stale_manifest
+        
         if not manifest_data:
             logger.error("获取版本清单失败")
             return False
         
-        self.manifest_data = manifest_data
+        self._set_manifest(manifest_data)
+        self.etag = etag
+        self._stale_manifest = None
         
         # 保存到缓存
         self._save_to_cache()
@@ -83,6 +116,26 @@ class VersionManifest:
         
         return True
     
+    def _set_manifest(self, manifest_data: Dict[str, Any]):
+        """
+        设置版本清单并重建索引
+        
+        Args:
+            manifest_data: 版本清单数据
+        """
+        versions_by_id = {}
+        versions_by_type: Dict[str, List[Dict[str, Any]]] = {}
+        for version in manifest_data.get("versions", []):
+            version_id = version.get("id")
+            # 清单中若有重复 ID，保持与线性查找一致：取第一个
+            if version_id is not None and version_id not in versions_by_id:
+                versions_by_id[version_id] = version
+            versions_by_type.setdefault(version.get("type"), []).append(version)
+        
+        self._versions_by_id = versions_by_id
+        self._versions_by_type = versions_by_type
+        self.manifest_data = manifest_data
+    
     def get_version_info(self, version_id: str) -> Optional[Dict[str, Any]]:
         """
         获取指定版本的信息
@@ -97,10 +150,9 @@ class VersionManifest:
             if not self.load_manifest():
                 return None
         
-        versions = self.manifest_data.get("versions", [])
-        for version in versions:
-            if version.get("id") == version_id:
-                return version
+        version = self._versions_by_id.get(version_id)
+        if version is not None:
+            return version
         
         logger.warning(f"未找到版本: {version_id}")
         return None
@@ -140,11 +192,11 @@ class VersionManifest:
             if not self.load_manifest():
                 return []
         
-        versions = self.manifest_data.get("versions", [])
-        
         # 类型过滤
         if version_type:
-            versions = [v for v in versions if v.get("type") == version_type]
+            versions = list(self._versions_by_type.get(version_type, []))
+        else:
+            versions = self.manifest_data.get("versions", [])
         
         # 限制数量
         if limit:
@@ -172,23 +224,36 @@ class VersionManifest:
     def _load_from_cache(self) -> bool:
         """从缓存加载"""
         cache_file = self._get_cache_file()
-        if not cache_file.exists():
+        try:
+            st = cache_file.stat()
+        except OSError:
             return False
         
         try:
-            cache_file = self._get_cache_file()
-            with open(cache_file, "r", encoding="utf-8") as f:
-                cache_data = json.load(f)
+            cache_key = (cache_file, st.st_mtime_ns, st.st_size)
+            memo = VersionManifest._cache_memo
+            if memo is not None and memo[0] == cache_key:
+                cache_data = memo[1]
+            else:
+                cache_data = json_loads(cache_file.read_bytes())
+                with self._cache_memo_lock:
+                    VersionManifest._cache_memo = (cache_key, cache_data)
             
             # 检查缓存是否过期
             cache_time = datetime.fromisoformat(cache_data.get("cache_time", ""))
             expiry_time = cache_time + timedelta(hours=self.CACHE_EXPIRY_HOURS)
+            self.etag = cache_data.get("etag")
             
             if datetime.now() > expiry_time:
                 logger.debug("缓存已过期")
+                self._stale_manifest = cache_data.get("manifest")
+                return False
+            
+            manifest_data = cache_data.get("manifest")
+            if not manifest_data:
                 return False
             
-            self.manifest_data = cache_data.get("manifest")
+            self._set_manifest(manifest_data)
             return True
         
         except Exception as e:
@@ -201,11 +266,17 @@ class VersionManifest:
             cache_file = self._get_cache_file()
             cache_data = {
                 "cache_time": datetime.now().isoformat(),
+                "etag": self.etag,
                 "manifest": self.manifest_data
             }
             
-            with open(cache_file, "w", encoding="utf-8") as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2)
+            # 缓存文件仅供程序读取，使用紧凑格式（更小、序列化更快）
+            atomic_write_bytes(cache_file, json_dumps(cache_data, indent=False))
+            
+            # 刚写入的内容直接记入进程内缓存
+            st = cache_file.stat()
+            with self._cache_memo_lock:
+                VersionManifest._cache_memo = ((cache_file, st.st_mtime_ns, st.st_size), cache_data)
             
             logger.debug(f"版本清单已缓存到: {cache_file}")
         
@@ -214,6 +285,9 @@ class VersionManifest:
     
     def clear_cache(self):
         """清除缓存"""
+        with self._cache_memo_lock:
+            VersionManifest._cache_memo = None
+        
         cache_file = self._get_cache_file()
         if cache_file.exists():
             cache_file.unlink()
@@ -2,6 +2,7 @@
 Minecraft 游戏启动器
 负责构建和执行 Minecraft 启动命令
 """
+import functools
 import json
 import subprocess
 import platform
@@ -13,6 +14,46 @@ from utils.logger import logger
 from utils.process_helper import ProcessHelper
 
 
+@functools.lru_cache(maxsize=2048)
+def _split_maven_name(name: str) -> Optional[tuple]:
+    """
+    拆分 Maven 名称（进程内缓存，每次启动都会对上百个相同的库名重复解析）
+    
+    Args:
+        name: Maven 名称，格式 groupId:artifactId:version[:classifier]
+        
+    Returns:
+        (groupId, artifactId, version, classifier)，格式不正确返回 None
+    """
+    parts = name.split(":")
+    if len(parts) < 3:
+        return None
+    return parts[0], parts[1], parts[2], parts[3] if len(parts) > 3 else None
+
+
+@functools.lru_cache(maxsize=2048)
+def _maven_relative_path(name: str) -> Optional[str]:
+    """
+    Maven 名称转换为 libraries 目录下的相对路径（进程内缓存）
+    
+    Args:
+        name: Maven 名称
+        
+    Returns:
+        相对路径，格式不正确返回 None
+    """
+    parsed = _split_maven_name(name)
+    if not parsed:
+        return None
+    
+    group, artifact, version, classifier = parsed
+    if classifier:
+        file_name = f"{artifact}-{version}-{classifier}.jar"
+    else:
+        file_name = f"{artifact}-{version}.jar"
+    return f"{group.replace('.', '/')}/{artifact}/{version}/{file_name}"
+
+
 class GameLauncher:
     """Minecraft 游戏启动器"""
     
@@ -872,30 +913,26 @@ class GameLauncher:
             # 智能去重：
             # 1. 对于natives变体（如natives-windows）：不去重，全部保留
             # 2. 对于相同库不同版本（如asm:9.6 vs asm:9.9）：去重，保留新版本
-            if name:
-                parts = name.split(":")
-                if len(parts) >= 3:
-                    groupId = parts[0]
-                    artifactId = parts[1]
-                    version = parts[2]
-                    classifier = parts[3] if len(parts) >= 4 else None
-                    
-                    # 如果有classifier（如natives-windows），使用完整name作为key（不去重）
-                    if classifier:
-                        base_name = name
-                    else:
-                        # 没有classifier，使用 groupId:artifactId 作为key（去重同名库的不同版本）
-                        base_name = f"{groupId}:{artifactId}"
-                    
-                    # 检查是否已有同名库
-                    if base_name in added_libs:
-                        old_path = added_libs[base_name]
-                        # 比较版本，保留较新的（后面的覆盖前面的）
-                        if str(old_path) in classpath_entries:
-                            classpath_entries.remove(str(old_path))
-                            logger.info(f"⚠️ 库冲突，替换: {old_path.name} -> {lib_path.name}")
-                    
-                    added_libs[base_name] = lib_path
+            parsed = _split_maven_name(name) if name else None
+            if parsed:
+                groupId, artifactId, version, classifier = parsed
+                
+                # 如果有classifier（如natives-windows），使用完整name作为key（不去重）
+                if classifier:
+                    base_name = name
+                else:
+                    # 没有classifier，使用 groupId:artifactId 作为key（去重同名库的不同版本）
+                    base_name = f"{groupId}:{artifactId}"
+                
+                # 检查是否已有同名库
+                if base_name in added_libs:
+                    old_path = added_libs[base_name]
+                    # 比较版本，保留较新的（后面的覆盖前面的）
+                    if str(old_path) in classpath_entries:
+                        classpath_entries.remove(str(old_path))
+                        logger.info(f"⚠️ 库冲突，替换: {old_path.name} -> {lib_path.name}")
+                
+                added_libs[base_name] = lib_path
             
             # 添加到classpath
             if str(lib_path) not in classpath_entries:
@@ -914,25 +951,11 @@ class GameLauncher:
             库文件路径
         """
         try:
-            parts = name.split(":")
-            if len(parts) < 3:
+            relative_path = _maven_relative_path(name)
+            if not relative_path:
                 return None
             
-            group = parts[0]
-            artifact = parts[1]
-            version = parts[2]
-            classifier = parts[3] if len(parts) > 3 else None
-            
-            # 构建路径
-            group_path = group.replace(".", "/")
-            
-            if classifier:
-                file_name = f"{artifact}-{version}-{classifier}.jar"
-            else:
-                file_name = f"{artifact}-{version}.jar"
-            
-            lib_path = self.minecraft_dir / "libraries" / group_path / artifact / version / file_name
-            return lib_path
+            return self.minecraft_dir / "libraries" / relative_path
             
         except Exception as e:
             logger.error(f"解析库名称时发生异常: {e}")
@@ -55,6 +55,9 @@ class MicrosoftAuth:
         self.minecraft_profile = None
         self.offline_account = None  # 离线账号
         
+        # 复用连接：设备码轮询、令牌刷新及 Xbox/Minecraft 认证链会多次请求相同主机
+        self._session = requests.Session()
+        
         # 启动时从统一配置加载认证信息
         self._load_auth_config()
     
@@ -97,7 +100,7 @@ class MicrosoftAuth:
             }
             
             logger.info("正在获取设备代码...")
-            response = requests.post(self.DEVICE_CODE_URL, data=data, timeout=30)
+            response = self._session.post(self.DEVICE_CODE_URL, data=data, timeout=30)
             
             # 记录详细错误信息
             if response.status_code != 200:
@@ -148,7 +151,7 @@ class MicrosoftAuth:
             }
             
             logger.info("正在轮询设备令牌...")
-            response = requests.post(self.DEVICE_TOKEN_URL, data=data, timeout=30)
+            response = self._session.post(self.DEVICE_TOKEN_URL, data=data, timeout=30)
             
             # 检查响应
             if response.status_code == 400:
@@ -293,7 +296,7 @@ class MicrosoftAuth:
             }
             
             logger.info("正在获取Microsoft令牌...")
-            response = requests.post(self.TOKEN_URL, data=data, headers=headers, timeout=30)
+            response = self._session.post(self.TOKEN_URL, data=data, headers=headers, timeout=30)
             response.raise_for_status()
             
             result = response.json()
@@ -342,7 +345,7 @@ class MicrosoftAuth:
             }
             
             logger.info("🔄 正在使用 refresh_token 刷新 Microsoft 令牌...")
-            response = requests.post(self.TOKEN_URL, data=data, headers=headers, timeout=30)
+            response = self._session.post(self.TOKEN_URL, data=data, headers=headers, timeout=30)
             response.raise_for_status()
             
             result = response.json()
@@ -486,7 +489,7 @@ class MicrosoftAuth:
             }
             
             logger.info("正在获取Xbox Live令牌...")
-            response = requests.post(
+            response = self._session.post(
                 self.XBOX_LIVE_AUTH_URL,
                 json=payload,
                 headers=headers,
@@ -559,7 +562,7 @@ class MicrosoftAuth:
             }
             
             logger.info("正在获取XSTS令牌...")
-            response = requests.post(
+            response = self._session.post(
                 self.XSTS_AUTH_URL,
                 json=payload,
                 headers=headers,
@@ -634,7 +637,7 @@ class MicrosoftAuth:
             }
             
             logger.info("正在获取Minecraft令牌...")
-            response = requests.post(
+            response = self._session.post(
                 self.MINECRAFT_AUTH_URL,
                 json=payload,
                 headers=headers,
@@ -685,7 +688,7 @@ class MicrosoftAuth:
             }
             
             logger.info("正在获取Minecraft用户资料...")
-            response = requests.get(
+            response = self._session.get(
                 self.MINECRAFT_PROFILE_URL,
                 headers=headers,
                 timeout=30
@@ -84,16 +84,16 @@ class MrPackInstaller:
 
             # 使用 DownloadManager 安装 (DownloadManager 内部已经是同步阻塞的，放入线程池执行)
             def run_download_manager():
-                manager = MinecraftDownloadManager(
+                with MinecraftDownloadManager(
                     max_connections=16,
                     progress_callback=dm_progress
-                )
-                return manager.download_with_loader(
-                    mc_version=mc_version,
-                    loader_type=loader_type if isinstance(loader_type, LoaderType) else str(loader_type),
-                    loader_version=loader_version,
-                    custom_name=instance_name
-                )
+                ) as manager:
+                    return manager.download_with_loader(
+                        mc_version=mc_version,
+                        loader_type=loader_type if isinstance(loader_type, LoaderType) else str(loader_type),
+                        loader_version=loader_version,
+                        custom_name=instance_name
+                    )
             
             success = await loop.run_in_executor(None, run_download_manager)
             
@@ -124,7 +124,7 @@ class MrPackInstaller:
             # 移除内部的 import asyncio，使用顶层导入
             # import asyncio
             # 配置 httpx 连接池限制以匹配并发数
-            limits = httpx.Limits(max_connections=max_concurrent, max_keepalive_connections=20)
+            limits = httpx.Limits(max_connections=max_concurrent, max_keepalive_connections=max_concurrent)
             # 启用 HTTP/2 支持
             async with httpx.AsyncClient(http2=True, timeout=60.0, limits=limits, follow_redirects=True) as client:  # 增加默认超时时间
                 # 限制并发数